@@ -0,0 +1,73 @@
+import sys
+
+import maze
+from maze import ALGORITHMS, Maze
+
+
+class ListQueueFrontier():
+    """The original list-backed queue frontier, kept as a baseline."""
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+def time_solve(filename, frontier, repeat, algorithm="bfs"):
+    """
+    Solves the maze repeat times with the given frontier class and algorithm.
+    Returns the best time in seconds, the number of states explored and
+    the cost of the solution.
+    """
+    maze.QueueFrontier = frontier
+    best = None
+    for _ in range(repeat):
+        m = Maze(filename)
+        m.solve(algorithm)
+        best = m.elapsed if best is None else min(best, m.elapsed)
+    return best, m.num_explored, sum(m.cost(cell) for cell in m.solution[1])
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [maze.txt] [repeat]")
+    filename = sys.argv[1] if len(sys.argv) > 1 else "maze3.txt"
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    frontiers = {
+        "list frontier": ListQueueFrontier,
+        "deque frontier": maze.QueueFrontier,
+    }
+    results = {}
+    for name, frontier in frontiers.items():
+        results[name] = time_solve(filename, frontier, repeat)
+        elapsed, explored, _ = results[name]
+        print(f"{name}: {elapsed * 1000:.3f}ms, {explored} states explored")
+
+    baseline = results["list frontier"][0]
+    print(f"Speedup: {baseline / results['deque frontier'][0]:.1f}x")
+    print()
+
+    # Compare the search algorithms, all with the deque frontier
+    for algorithm in ALGORITHMS:
+        elapsed, explored, cost = time_solve(filename, frontiers["deque frontier"], repeat, algorithm)
+        print(f"{algorithm}: {elapsed * 1000:.3f}ms, {explored} states explored, path cost {cost}")
+
+
+if __name__ == "__main__":
+    main()
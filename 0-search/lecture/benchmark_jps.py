@@ -0,0 +1,48 @@
+import os
+import sys
+import tempfile
+
+from generate import rooms
+from maze import Maze
+
+
+def compare(filename, algorithms, repeat):
+    """
+    Solves the maze with every algorithm repeat times. Returns the best
+    time in seconds, states explored and solution length of each.
+    """
+    results = {}
+    for algorithm in algorithms:
+        best = None
+        for _ in range(repeat):
+            m = Maze(filename)
+            m.solve(algorithm)
+            best = m.elapsed if best is None else min(best, m.elapsed)
+        results[algorithm] = (best, m.num_explored, len(m.solution[0]))
+    return results
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark_jps.py [room size] [repeat]")
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    # Open-room mazes of growing size, written to a temporary file for Maze to load
+    for count in [2, 4, 8, 16]:
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as f:
+            f.write("\n".join(rooms(count, count, size, seed=count)))
+        try:
+            results = compare(f.name, ["bfs", "astar", "jps"], repeat)
+        finally:
+            os.remove(f.name)
+
+        print(f"{count} x {count} rooms of {size} x {size}:")
+        for algorithm, (elapsed, explored, length) in results.items():
+            print(f"  {algorithm}: {elapsed * 1000:.3f}ms, {explored} states explored, {length} steps")
+        speedup = results["bfs"][0] / results["jps"][0]
+        print(f"  jps speedup over bfs: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import random
+import sys
+
+
+def generate(height, width, loops=0.0, weights=0.0, seed=None):
+    """
+    Returns the lines of a random maze of height x width cells, carved by
+    a depth-first backtracker from the top left to the bottom right corner.
+    Loops is the share of remaining walls knocked down to open extra paths,
+    weights the share of open cells given a random cost from 2 to 9.
+    """
+    rng = random.Random(seed)
+
+    # Cells sit on odd coordinates, the walls between them on even ones
+    rows, cols = 2 * height + 1, 2 * width + 1
+    grid = [["#"] * cols for _ in range(rows)]
+    grid[1][1] = " "
+    stack = [(1, 1)]
+    while stack:
+        i, j = stack[-1]
+        unvisited = [
+            (i + di, j + dj) for di, dj in [(-2, 0), (2, 0), (0, -2), (0, 2)]
+            if 0 < i + di < rows and 0 < j + dj < cols and grid[i + di][j + dj] == "#"
+        ]
+        if not unvisited:
+            stack.pop()
+            continue
+        r, c = rng.choice(unvisited)
+        grid[(i + r) // 2][(j + c) // 2] = " "
+        grid[r][c] = " "
+        stack.append((r, c))
+
+    # Knock down inner walls so there is more than one way through
+    for i in range(1, rows - 1):
+        for j in range(1, cols - 1):
+            if grid[i][j] == "#" and (i + j) % 2 == 1 and rng.random() < loops:
+                grid[i][j] = " "
+
+    for i in range(rows):
+        for j in range(cols):
+            if grid[i][j] == " " and rng.random() < weights:
+                grid[i][j] = str(rng.randint(2, 9))
+
+    grid[1][1] = "A"
+    grid[rows - 2][cols - 2] = "B"
+    return ["".join(row) for row in grid]
+
+
+def rooms(height, width, size=10, doors=2, seed=None):
+    """
+    Returns the lines of a maze of height x width open rooms, each of
+    size x size cells, with up to doors random gaps in the walls between
+    neighboring rooms.
+    """
+    rng = random.Random(seed)
+    rows, cols = height * (size + 1) + 1, width * (size + 1) + 1
+    grid = [
+        ["#" if i % (size + 1) == 0 or j % (size + 1) == 0 else " " for j in range(cols)]
+        for i in range(rows)
+    ]
+
+    # Open doors in the right and bottom wall of every room that has a neighbor there
+    for r in range(height):
+        for c in range(width):
+            top, left = r * (size + 1), c * (size + 1)
+            for _ in range(doors):
+                if c + 1 < width:
+                    grid[top + rng.randint(1, size)][left + size + 1] = " "
+                if r + 1 < height:
+                    grid[top + size + 1][left + rng.randint(1, size)] = " "
+
+    grid[1][1] = "A"
+    grid[rows - 2][cols - 2] = "B"
+    return ["".join(row) for row in grid]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "rooms":
+        if len(sys.argv) not in range(4, 7):
+            sys.exit("Usage: python generate.py rooms height width [size] [seed]")
+        size = int(sys.argv[4]) if len(sys.argv) > 4 else 10
+        seed = int(sys.argv[5]) if len(sys.argv) > 5 else None
+        print("\n".join(rooms(int(sys.argv[2]), int(sys.argv[3]), size, seed=seed)))
+        return
+
+    if len(sys.argv) not in range(3, 7):
+        sys.exit("Usage: python generate.py height width [loops] [weights] [seed]\n"
+                 "       python generate.py rooms height width [size] [seed]")
+    height, width = int(sys.argv[1]), int(sys.argv[2])
+    loops = float(sys.argv[3]) if len(sys.argv) > 3 else 0.0
+    weights = float(sys.argv[4]) if len(sys.argv) > 4 else 0.0
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else None
+    print("\n".join(generate(height, width, loops, weights, seed)))
+
+
+if __name__ == "__main__":
+    main()
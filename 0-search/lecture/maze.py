@@ -1,21 +1,38 @@
+import hashlib
+import heapq
+import itertools
+import mmap
+import os
+import re
+import struct
 import sys
+import time
+from array import array
+from collections import defaultdict, deque
 
 class Node():
-    def __init__(self, state, parent, action):
+    def __init__(self, state, parent, action, cost=0):
         self.state = state
         self.parent = parent
         self.action = action
 
+        # Path cost from the start, used by the priority searches
+        self.cost = cost
+
 
 class StackFrontier():
     def __init__(self):
-        self.frontier = []
+        self.frontier = deque()
+
+        # Counts the nodes of every state in the frontier for O(1) lookups
+        self.states = {}
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,9 +41,16 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            return self.discard(self.frontier.pop())
+
+    def discard(self, node):
+        """Drops a removed node from the state index and returns it."""
+        count = self.states[node.state] - 1
+        if count:
+            self.states[node.state] = count
+        else:
+            del self.states[node.state]
+        return node
 
 
 class QueueFrontier(StackFrontier):
@@ -35,69 +59,191 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            return self.discard(self.frontier.popleft())
+
+
+class PriorityFrontier(StackFrontier):
+    """
+    Binary heap frontier that removes the node of lowest priority first.
+    A state added again with a lower priority leaves its old node in the
+    heap, the search skips it once the state is explored.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = []
+
+        # Breaks priority ties first in, first out, so nodes are never compared
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            return self.discard(heapq.heappop(self.frontier)[2])
+
+
+# Priority of a node in each informed search, from its path cost and heuristic
+PRIORITIES = {
+    "greedy": lambda cost, heuristic: heuristic,
+    "astar": lambda cost, heuristic: cost + heuristic,
+    "dijkstra": lambda cost, heuristic: cost,
+}
+
+# Breadth-first searches over a NumPy grid of flat cell indices, see Maze.solve_grid
+GRID_ALGORITHMS = ["grid", "wavefront"]
+
+ALGORITHMS = ["bfs", "dfs", *PRIORITIES, "jps", *GRID_ALGORITHMS, "field"]
+
+# Directory distance fields are saved in, keyed by the hash of the maze
+DISTANCE_CACHE = ".maze_cache"
+
+# Bit of every character in a text maze: 0 for open cells, 1 for walls
+WALL_BITS = defaultdict(lambda: "1", {ord(c): "0" for c in " AB123456789"})
+
+# Characters the text output draws open cells and walls with
+TEXT_CELLS = str.maketrans("01", " █")
+
+# Palette indices and colors of the cells in output_image
+EMPTY, EXPLORED, SOLUTION, START, GOAL, WALL = range(6)
+PALETTE = [
+    (237, 240, 252),
+    (212, 97, 85),
+    (220, 235, 113),
+    (255, 0, 0),
+    (0, 171, 28),
+    (40, 40, 40),
+]
+
+# Binary maze files: magic, height, width, start, goal and number of weighted
+# cells, then the packed wall bits, then a (row, column, cost) triple per weighted cell
+MAZE_MAGIC = b"MAZEBIT1"
+MAZE_HEADER = struct.Struct("<8s7q")
 
 class Maze():
 
     def __init__(self, filename):
+        """
+        Loads a text maze, or a binary maze written by save when the
+        filename ends in .maze. Walls are kept as packed bits, one per
+        cell and ceil(width / 8) bytes per row, most significant bit first.
+        """
+        self.costs = {}
+        self._walls = None
+        self._open_cells = None
+        self.explored_mask = None
+        if filename.endswith(".maze"):
+            self.load_binary(filename)
+        else:
+            self.load_text(filename)
+        self.solution = None
+
 
-        # Read file and set height and width of maze
+    def load_text(self, filename):
+        """Streams a text maze line by line into packed wall bits."""
+        rows = []
+        starts = []
+        goals = []
+        self.width = 0
         with open(filename) as f:
-            contents = f.read()
+            for i, line in enumerate(f):
+                line = line.rstrip("\r\n")
+                self.width = max(self.width, len(line))
+
+                # Find the start, goal and weighted cells in the same pass
+                if "A" in line:
+                    starts.extend((i, j) for j, c in enumerate(line) if c == "A")
+                if "B" in line:
+                    goals.extend((i, j) for j, c in enumerate(line) if c == "B")
+                for match in re.finditer("[1-9]", line):
+                    self.costs[(i, match.start())] = int(match.group())
+
+                # Pad the row to whole bytes, cells past the end of a line are open
+                size = (len(line) + 7) // 8
+                bits = line.translate(WALL_BITS).ljust(size * 8, "0")
+                rows.append(int(bits, 2).to_bytes(size, "big") if size else b"")
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        if len(starts) != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if len(goals) != 1:
             raise Exception("maze must have exactly one goal")
-
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
-
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
-
-        self.solution = None
+        self.start = starts[0]
+        self.goal = goals[0]
+
+        self.height = len(rows)
+        self.stride = (self.width + 7) // 8
+        self.bits = bytearray(self.height * self.stride)
+        for i, row in enumerate(rows):
+            self.bits[i * self.stride:i * self.stride + len(row)] = row
+
+
+    def load_binary(self, filename):
+        """Maps a binary maze into memory, its wall bits are read from the file on demand."""
+        with open(filename, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.height, self.width, *cells, weighted = MAZE_HEADER.unpack_from(self.mmap)
+        if magic != MAZE_MAGIC:
+            raise Exception(f"{filename} is not a binary maze")
+        self.start = tuple(cells[:2])
+        self.goal = tuple(cells[2:])
+        self.stride = (self.width + 7) // 8
+
+        end = MAZE_HEADER.size + self.height * self.stride
+        self.bits = memoryview(self.mmap)[MAZE_HEADER.size:end]
+        costs = array("q", self.mmap[end:end + weighted * 3 * 8])
+        for k in range(0, len(costs), 3):
+            self.costs[(costs[k], costs[k + 1])] = costs[k + 2]
+
+
+    def save(self, filename):
+        """Writes the maze in the binary format read back by Maze(filename)."""
+        costs = array("q")
+        for (i, j), cost in self.costs.items():
+            costs.extend((i, j, cost))
+        with open(filename, "wb") as f:
+            f.write(MAZE_HEADER.pack(MAZE_MAGIC, self.height, self.width,
+                                     *self.start, *self.goal, len(self.costs)))
+            f.write(self.bits)
+            f.write(costs.tobytes())
+
+
+    def wall(self, i, j):
+        """Returns True if the cell in row i and column j is a wall."""
+        return bool(self.bits[i * self.stride + j // 8] >> (7 - j % 8) & 1)
+
+
+    @property
+    def walls(self):
+        """Walls as nested lists of booleans, unpacked from the bits on first use."""
+        if self._walls is None:
+            self._walls = []
+            for i in range(self.height):
+                row = self.bits[i * self.stride:(i + 1) * self.stride]
+                bits = format(int.from_bytes(row, "big"), f"0{self.stride * 8}b")
+                self._walls.append([bit == "1" for bit in bits[:self.width]])
+        return self._walls
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
-        print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
-                else:
-                    print(" ", end="")
-            print()
-        print()
+        # Draw every row as a list of characters, then lay the cells of the solution on top
+        rows = []
+        for i in range(self.height):
+            row = self.bits[i * self.stride:(i + 1) * self.stride]
+            bits = format(int.from_bytes(row, "big"), f"0{self.stride * 8}b")
+            rows.append(list(bits[:self.width].translate(TEXT_CELLS)))
+        for (i, j), cost in self.costs.items():
+            rows[i][j] = str(cost)
+        if self.solution is not None:
+            for i, j in self.solution[1]:
+                rows[i][j] = "*"
+        rows[self.start[0]][self.start[1]] = "A"
+        rows[self.goal[0]][self.goal[1]] = "B"
+        print("\n" + "\n".join("".join(row) for row in rows) + "\n")
 
 
     def neighbors(self, state):
@@ -116,15 +262,49 @@ class Maze():
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def cost(self, state):
+        """Returns the cost of moving into state, 1 unless the maze says otherwise."""
+        return self.costs.get(state, 1)
+
+
+    def heuristic(self, state):
+        """Manhattan distance from state to the goal."""
+        return abs(state[0] - self.goal[0]) + abs(state[1] - self.goal[1])
+
+
+    def solve(self, algorithm="bfs"):
+        """
+        Finds a solution to maze, if one exists, with one of ALGORITHMS.
+        Records the number of states explored and the seconds taken.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm}, expected one of {ALGORITHMS}")
+
+        self.explored_mask = None
+        start = time.perf_counter()
+        try:
+            if algorithm in GRID_ALGORITHMS:
+                self.solve_grid(wavefront=algorithm == "wavefront")
+            elif algorithm == "jps":
+                self.solve_jps()
+            elif algorithm == "field":
+                self.solve_field()
+            elif algorithm in PRIORITIES:
+                self.solve_informed(PRIORITIES[algorithm])
+            else:
+                self.solve_uninformed(StackFrontier() if algorithm == "dfs" else QueueFrontier())
+        finally:
+            self.elapsed = time.perf_counter() - start
+
+
+    def solve_uninformed(self, frontier):
+        """Finds a solution with a stack (DFS) or queue (BFS) frontier."""
 
         # Keep track of number of states explored
         self.num_explored = 0
 
         # Initialize frontier to just the starting position
         start = Node(state=self.start, parent=None, action=None)
-        frontier = QueueFrontier()
         frontier.add(start)
 
         # Initialize an empty explored set
@@ -143,15 +323,7 @@ class Maze():
 
             # If node is the goal, then we have a solution
             if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+                self.solution = self.trace(node)
                 return
 
             # Mark node as explored
@@ -164,66 +336,457 @@ class Maze():
                     frontier.add(child)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
-
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
-
-        img.save(filename)
-
-
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
-
-m = Maze(sys.argv[1])
-print("Maze:")
-m.print()
-print("Solving...")
-m.solve()
-print("States Explored:", m.num_explored)
-print("Solution:")
-m.print()
-m.output_image("maze.png", show_explored=True)
+    def solve_informed(self, priority):
+        """
+        Finds a solution with a priority frontier, expanding the node of
+        lowest priority(path cost, heuristic) first.
+        """
+        self.num_explored = 0
+
+        start = Node(state=self.start, parent=None, action=None)
+        frontier = PriorityFrontier()
+        frontier.add(start, priority(0, self.heuristic(self.start)))
+
+        # Lowest path cost found so far to every state reached
+        self.explored = set()
+        best = {self.start: 0}
+
+        while True:
+            if frontier.empty():
+                raise Exception("no solution")
+
+            # Skip nodes left behind by a cheaper path to their state
+            node = frontier.remove()
+            if node.state in self.explored:
+                continue
+            self.num_explored += 1
+
+            if node.state == self.goal:
+                self.solution = self.trace(node)
+                return
+
+            self.explored.add(node.state)
+
+            # Add neighbors to frontier, again if the new path to them is cheaper
+            for action, state in self.neighbors(node.state):
+                cost = node.cost + self.cost(state)
+                if state not in self.explored and cost < best.get(state, cost + 1):
+                    best[state] = cost
+                    child = Node(state=state, parent=node, action=action, cost=cost)
+                    frontier.add(child, priority(cost, self.heuristic(state)))
+
+
+    def grid(self):
+        """
+        Returns the open cells as a NumPy boolean array surrounded by a
+        border of walls, so the four neighbors of a flat index i are
+        i - width, i + width, i - 1 and i + 1 without wrapping rows.
+        """
+        import numpy as np
+        bits = np.frombuffer(self.bits, dtype=np.uint8).reshape(self.height, self.stride)
+        grid = np.zeros((self.height + 2, self.width + 2), dtype=bool)
+        grid[1:-1, 1:-1] = np.unpackbits(bits, axis=1)[:, :self.width] == 0
+        return grid
+
+
+    def solve_grid(self, wavefront=False):
+        """
+        Finds a shortest solution by breadth-first search over flat cell
+        indices, ignoring cell costs. With wavefront, every layer of the
+        search is expanded at once with NumPy array operations, which
+        pays off in open mazes with wide frontiers. Records the parent
+        and distance of every cell reached and the explored cells as masks.
+        """
+        import numpy as np
+        grid = self.grid()
+        width = grid.shape[1]
+        start = (self.start[0] + 1) * width + self.start[1] + 1
+        goal = (self.goal[0] + 1) * width + self.goal[1] + 1
+
+        # Parent and distance of every cell, -1 until reached
+        self.parents = np.full(grid.size, -1, dtype=np.int32)
+        self.distances = np.full(grid.size, -1, dtype=np.int32)
+        self.parents[start] = start
+        self.distances[start] = 0
+
+        if wavefront:
+            expanded = bfs_wavefront(grid.ravel(), width, self.parents, self.distances, goal)
+        else:
+            expanded = bfs_flat(grid.ravel(), width, self.parents, self.distances, start, goal)
+        self.num_explored = len(expanded)
+
+        explored = np.zeros(grid.size, dtype=bool)
+        explored[expanded] = True
+        self.explored_mask = explored.reshape(grid.shape)[1:-1, 1:-1]
+        self.explored = None
+        if self.parents[goal] < 0:
+            raise Exception("no solution")
+
+        # Walk the parents back from the goal, naming each step by its offset
+        moves = {-width: "up", width: "down", -1: "left", 1: "right"}
+        actions = []
+        cells = []
+        cell = goal
+        while cell != start:
+            parent = int(self.parents[cell])
+            actions.append(moves[cell - parent])
+            cells.append((cell // width - 1, cell % width - 1))
+            cell = parent
+        actions.reverse()
+        cells.reverse()
+        self.solution = (actions, cells)
+
+
+    def digest(self):
+        """Returns a hash of the size and walls of the maze."""
+        sha = hashlib.sha1(f"{self.height}x{self.width}".encode())
+        sha.update(self.bits)
+        return sha.hexdigest()
+
+
+    def distance_field(self, goal=None, cache=DISTANCE_CACHE):
+        """
+        Returns a NumPy array of the number of moves from every cell to
+        goal, the maze's own by default, and -1 for cells that cannot
+        reach it. Cell costs are ignored. Fields are saved in the cache
+        directory and memory-mapped from there next time, None turns
+        the cache off.
+        """
+        import numpy as np
+        goal = self.goal if goal is None else tuple(goal)
+        if self.wall(*goal):
+            raise ValueError(f"goal {goal} is a wall")
+
+        path = None
+        if cache is not None:
+            path = os.path.join(cache, f"{self.digest()}-{goal[0]}-{goal[1]}.npy")
+            if os.path.exists(path):
+                return np.load(path, mmap_mode="r")
+
+        # Breadth-first search from the goal until every reachable cell is found
+        grid = self.grid()
+        width = grid.shape[1]
+        source = (goal[0] + 1) * width + goal[1] + 1
+        parents = np.full(grid.size, -1, dtype=np.int32)
+        distances = np.full(grid.size, -1, dtype=np.int32)
+        parents[source] = source
+        distances[source] = 0
+        bfs_flat(grid.ravel(), width, parents, distances, source, -1)
+        field = np.ascontiguousarray(distances.reshape(grid.shape)[1:-1, 1:-1])
+
+        # Write to a file of this process first, so no reader ever maps a partial field
+        if path is not None:
+            os.makedirs(cache, exist_ok=True)
+            with open(f"{path}.{os.getpid()}.tmp", "wb") as f:
+                np.save(f, field)
+            os.replace(f"{path}.{os.getpid()}.tmp", path)
+        return field
+
+
+    def descend(self, field, start):
+        """
+        Returns the solution from start to the goal of the distance field
+        by stepping to a neighbor one move closer each time, or None if
+        start cannot reach the goal.
+        """
+        i, j = start
+        distance = int(field[i, j])
+        if distance < 0:
+            return None
+        moves = [("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1)]
+        actions = []
+        cells = []
+        while distance > 0:
+            for action, di, dj in moves:
+                r, c = i + di, j + dj
+                if 0 <= r < self.height and 0 <= c < self.width and field[r, c] == distance - 1:
+                    break
+            actions.append(action)
+            cells.append((r, c))
+            i, j = r, c
+            distance -= 1
+        return (actions, cells)
+
+
+    def solve_field(self):
+        """Finds a shortest solution by descending the distance field of the goal."""
+        self.solution = self.descend(self.distance_field(), self.start)
+        self.explored = set()
+        if self.solution is None:
+            self.num_explored = 0
+            raise Exception("no solution")
+        self.num_explored = len(self.solution[1]) + 1
+
+
+    def solve_many(self, starts, goal=None, cache=DISTANCE_CACHE):
+        """
+        Returns the shortest solution from each of starts to goal, the
+        maze's own by default, or None for starts that cannot reach it.
+        The distance field of the goal is computed or loaded once for all.
+        """
+        field = self.distance_field(goal, cache)
+        return [self.descend(field, start) for start in starts]
+
+
+    def waypoint_distances(self, waypoints, cache=DISTANCE_CACHE):
+        """
+        Returns the number of moves between every pair of waypoints as a
+        list of rows, None where one cannot reach the other.
+        """
+        distances = []
+        for waypoint in waypoints:
+            field = self.distance_field(waypoint, cache)
+            distances.append([int(field[other]) if field[other] >= 0 else None
+                              for other in map(tuple, waypoints)])
+        return distances
+
+
+    def solve_jps(self):
+        """
+        Finds a shortest solution by Jump Point Search, ignoring cell costs:
+        A* that expands only jump points, the cells where a straight run
+        through the maze meets a side passage that opens up, or the goal.
+        Moves are never diagonal, as in the 4-connected variant of
+        pathfinding.js, and the runs between jump points are expanded
+        back to unit moves in the solution.
+        """
+        self.num_explored = 0
+
+        start = Node(state=self.start, parent=None, action=None)
+        frontier = PriorityFrontier()
+        frontier.add(start, self.heuristic(self.start))
+
+        self.explored = set()
+        best = {self.start: 0}
+
+        while True:
+            if frontier.empty():
+                raise Exception("no solution")
+
+            node = frontier.remove()
+            if node.state in self.explored:
+                continue
+            self.num_explored += 1
+
+            if node.state == self.goal:
+                self.solution = self.trace_jumps(node)
+                return
+
+            self.explored.add(node.state)
+
+            # Jump from the node in every direction its parent does not prune
+            for direction in self.jump_directions(node):
+                state = self.jump(node.state, direction)
+                if state is None or state in self.explored:
+                    continue
+                cost = node.cost + abs(state[0] - node.state[0]) + abs(state[1] - node.state[1])
+                if cost < best.get(state, cost + 1):
+                    best[state] = cost
+                    child = Node(state=state, parent=node, action=direction, cost=cost)
+                    frontier.add(child, cost + self.heuristic(state))
+
+
+    def jump_directions(self, node):
+        """
+        Returns the directions worth jumping in from node: all four from
+        the start, otherwise straight on and to both sides, never back.
+        """
+        if node.parent is None:
+            return [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        di, dj = node.action
+        if dj:
+            return [(-1, 0), (1, 0), (0, dj)]
+        return [(0, -1), (0, 1), (di, 0)]
+
+
+    def jump(self, state, direction):
+        """
+        Runs from state one step at a time in direction, which is (row, column)
+        offsets, and returns the first jump point reached, or None at a wall.
+        A horizontal run stops where a wall beside it ends. A vertical run
+        also stops where a horizontal run from it would find a jump point.
+        """
+        # Runs go through the open cells surrounded by a border of walls,
+        # one row and column further down and right than in the maze
+        if self._open_cells is None:
+            border = [[False] * (self.width + 2)]
+            self._open_cells = border + [[False, *(not wall for wall in row), False]
+                                         for row in self.walls] + border
+        cells = self._open_cells
+        goal = (self.goal[0] + 1, self.goal[1] + 1)
+        i, j = state[0] + 1, state[1] + 1
+        di, dj = direction
+        if dj:
+            return run(cells, i, j, dj, goal)
+        while True:
+            i += di
+            row, behind = cells[i], cells[i - di]
+            if not row[j]:
+                return None
+            if ((i, j) == goal or (row[j - 1] and not behind[j - 1]) or (row[j + 1] and not behind[j + 1])
+                    or run(cells, i, j, 1, goal) or run(cells, i, j, -1, goal)):
+                return (i - 1, j - 1)
+
+
+    def trace_jumps(self, node):
+        """Returns the unit actions and cells leading from the start to node through its jump points."""
+        names = {(-1, 0): "up", (1, 0): "down", (0, -1): "left", (0, 1): "right"}
+        actions = []
+        cells = []
+        while node.parent is not None:
+            (i, j), (di, dj) = node.state, node.action
+            while (i, j) != node.parent.state:
+                actions.append(names[(di, dj)])
+                cells.append((i, j))
+                i, j = i - di, j - dj
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
+
+
+    def trace(self, node):
+        """Returns the actions and cells leading from the start to node."""
+        actions = []
+        cells = []
+        while node.parent is not None:
+            actions.append(node.action)
+            cells.append(node.state)
+            node = node.parent
+        actions.reverse()
+        cells.reverse()
+        return (actions, cells)
+
+
+    def mask(self, cells):
+        """Returns a NumPy boolean array of the maze, True at the given cells."""
+        import numpy as np
+        mask = np.zeros((self.height, self.width), dtype=bool)
+        if cells:
+            cells = np.array(list(cells), dtype=np.intp)
+            mask[cells[:, 0], cells[:, 1]] = True
+        return mask
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False, cell_size=50):
+        import numpy as np
+        from PIL import Image
+        cell_border = cell_size // 25
+
+        # Color every cell by its index into the palette, later layers on top
+        cells = np.full((self.height, self.width), EMPTY, dtype=np.uint8)
+        if self.solution is not None and show_explored:
+            explored = self.explored_mask if self.explored_mask is not None else self.mask(self.explored)
+            cells[explored] = EXPLORED
+        if self.solution is not None and show_solution:
+            cells[self.mask(self.solution[1])] = SOLUTION
+        cells[self.start] = START
+        cells[self.goal] = GOAL
+        cells[~self.grid()[1:-1, 1:-1]] = WALL
+
+        # Blow every cell up to a block of pixels, with a black border around it
+        colors = np.array(PALETTE, dtype=np.uint8)[cells]
+        inside = slice(cell_border, cell_size - cell_border + 1)
+        img = np.zeros((self.height, cell_size, self.width, cell_size, 3), dtype=np.uint8)
+        img[:, inside, :, inside] = colors[:, None, :, None]
+        img = img.reshape(self.height * cell_size, self.width * cell_size, 3)
+
+        Image.fromarray(img, "RGB").save(filename)
+
+
+def run(cells, i, j, dj, goal):
+    """
+    Runs horizontally from (i, j) through the bordered open cells, see
+    Maze.jump. Returns the maze cell of the first jump point, or None.
+    """
+    above, row, below = cells[i - 1], cells[i], cells[i + 1]
+    while True:
+        j += dj
+        if not row[j]:
+            return None
+        if (i, j) == goal or (above[j] and not above[j - dj]) or (below[j] and not below[j - dj]):
+            return (i - 1, j - 1)
+
+
+def bfs_flat(grid, width, parents, distances, start, goal):
+    """
+    Breadth-first search from start over the flat boolean grid until goal
+    is dequeued, filling in parents and distances. The queue is a
+    preallocated int32 array, read and written through memoryviews
+    which index faster than the arrays themselves. Returns the
+    expanded cells in order.
+    """
+    import numpy as np
+    queue = np.empty(int(grid.sum()), dtype=np.int32)
+    open_cells = memoryview(grid.view(np.uint8))
+    parent = memoryview(parents)
+    distance = memoryview(distances)
+    cells = memoryview(queue)
+
+    cells[0] = start
+    head, tail = 0, 1
+    while head < tail:
+        cell = cells[head]
+        head += 1
+        if cell == goal:
+            break
+        step = distance[cell] + 1
+        for neighbor in (cell - width, cell + width, cell - 1, cell + 1):
+            if open_cells[neighbor] and parent[neighbor] < 0:
+                parent[neighbor] = cell
+                distance[neighbor] = step
+                cells[tail] = neighbor
+                tail += 1
+    return queue[:head]
+
+
+def bfs_wavefront(grid, width, parents, distances, goal=None):
+    """
+    Breadth-first search expanding the whole frontier of one distance
+    at a time with array operations, from the cells already at distance
+    0 until goal is reached. Returns the expanded cells.
+    """
+    import numpy as np
+    frontier = np.flatnonzero(distances == 0).astype(np.int32)
+    offsets = np.array([-width, width, -1, 1], dtype=np.int32)
+    expanded = []
+    step = 0
+    while frontier.size and (goal is None or parents[goal] < 0):
+        expanded.append(frontier)
+        step += 1
+
+        # Every open, unreached neighbor of the frontier, first parent wins
+        neighbors = (frontier[:, None] + offsets).ravel()
+        sources = np.repeat(frontier, len(offsets))
+        reached = grid[neighbors] & (parents[neighbors] < 0)
+        neighbors, first = np.unique(neighbors[reached], return_index=True)
+        parents[neighbors] = sources[reached][first]
+        distances[neighbors] = step
+        frontier = neighbors
+    if goal is not None and parents[goal] >= 0:
+        expanded.append(np.array([goal], dtype=np.int32))
+    return np.concatenate(expanded) if expanded else np.empty(0, dtype=np.int32)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in [2, 3] or (len(sys.argv) == 3 and sys.argv[2] not in ALGORITHMS
+                                       and not sys.argv[2].endswith(".maze")):
+        sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(ALGORITHMS)}|output.maze]")
+
+    m = Maze(sys.argv[1])
+
+    # Convert the maze to the binary format instead of solving it
+    if len(sys.argv) == 3 and sys.argv[2].endswith(".maze"):
+        m.save(sys.argv[2])
+        print(f"Saved {m.height} x {m.width} maze to {sys.argv[2]}")
+        sys.exit()
+
+    print("Maze:")
+    m.print()
+    print("Solving...")
+    m.solve(sys.argv[2] if len(sys.argv) == 3 else "bfs")
+    print("States Explored:", m.num_explored)
+    print(f"Time: {m.elapsed * 1000:.3f}ms")
+    print("Solution:")
+    m.print()
+    m.output_image("maze.png", show_explored=True)
@@ -0,0 +1,113 @@
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import load_graph
+import util
+
+
+class ListQueueFrontier(util.QueueFrontier):
+    """The original list-backed queue frontier, kept as a baseline."""
+
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.frontier[0]
+            self.frontier = self.frontier[1:]
+            return node
+
+
+def list_frontier_shortest_path(source, target):
+    """
+    Runs the one-sided search on the original list-backed frontier.
+    """
+    degrees.QueueFrontier = ListQueueFrontier
+    try:
+        return degrees.shortest_path(source, target)
+    finally:
+        degrees.QueueFrontier = util.QueueFrontier
+
+
+def time_query(search, source, target):
+    """
+    Runs one query and returns its path and the time it took in seconds.
+    """
+    degrees.search_stats["expanded"] = 0
+    start = time.perf_counter()
+    path = search(source, target)
+    return path, time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python benchmark.py [directory] [queries]")
+    directory = sys.argv[1] if len(sys.argv) > 1 else "large"
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    # Measure how much memory each representation holds on to
+    print("Loading data...")
+    tracemalloc.start()
+    degrees.load_data(directory)
+    dict_memory = tracemalloc.get_traced_memory()[0]
+    graph = load_graph(directory)
+    graph_memory = tracemalloc.get_traced_memory()[0] - dict_memory
+    tracemalloc.stop()
+    print("Data loaded.")
+    print(f"dict graph: {dict_memory / 2 ** 20:.1f}MiB")
+    print(f"compact graph: {graph_memory / 2 ** 20:.1f}MiB")
+
+    # Cached trees would answer repeated sources without searching
+    degrees.tree_query_threshold = float("inf")
+
+    start = time.perf_counter()
+    degrees.build_landmarks(degrees.landmark_count)
+    print(f"{len(degrees.landmarks)} landmarks: {time.perf_counter() - start:.3f}s")
+
+    # Random person pairs, seeded so every run compares the same queries
+    rng = random.Random(50)
+    person_ids = sorted(degrees.people)
+    pairs = [tuple(rng.sample(person_ids, 2)) for _ in range(queries)]
+
+    searches = {
+        "bfs (list frontier)": list_frontier_shortest_path,
+        "bfs": degrees.shortest_path,
+        "bidirectional": degrees.bidirectional_shortest_path,
+        "compact bfs": graph.shortest_path,
+        "landmarks a*": degrees.landmark_shortest_path,
+    }
+    totals = dict.fromkeys(searches, 0.0)
+    expanded = dict.fromkeys(searches, 0)
+
+    for source, target in pairs:
+        lengths = {}
+        for name, search in searches.items():
+            path, elapsed = time_query(search, source, target)
+            totals[name] += elapsed
+            expanded[name] += degrees.search_stats["expanded"]
+            lengths[name] = None if path is None else len(path)
+
+        # Both searches must agree on the degrees of separation
+        if len(set(lengths.values())) != 1:
+            sys.exit(f"Mismatch for {source} -> {target}: {lengths}")
+
+    for name, total in totals.items():
+        line = f"{name}: {total:.3f}s total, {total / queries * 1000:.2f}ms per query"
+        if expanded[name]:
+            line += f", {expanded[name] / queries:.0f} nodes expanded per query"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
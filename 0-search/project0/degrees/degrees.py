@@ -1,6 +1,12 @@
 import csv
+import heapq
+import math
 import sys
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict, deque
 
+from graph import load_graph
 from util import Node, StackFrontier, QueueFrontier
 
 # Maps names to a set of corresponding person_ids
@@ -9,9 +15,46 @@ names = {}
 # Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
 people = {}
 
+# Maps person_ids to the id of their connected component
+components = {}
+
+# Every distinct lowercase name in sorted order, for prefix lookups
+sorted_names = []
+
+# Maps name trigrams to the sorted_names indexes containing them
+trigrams = {}
+
+# Number of distinct trigrams of every name in sorted_names
+trigram_counts = array("i")
+
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Maps source person_ids to their breadth-first trees, least recently used first
+trees = OrderedDict()
+
+# Memory cap for the cached trees in bytes
+tree_cache_limit = 256 * 2 ** 20
+
+# Number of queries from a source before its tree is built and cached
+tree_query_threshold = 3
+
+# Counts the queries made from every source person_id
+source_queries = Counter()
+
+# Components whose trees are larger than tree_cache_limit, every source
+# in a component reaches the same people so none of their trees would fit
+oversized_components = set()
+
+# Breadth-first distances from every landmark person_id, see build_landmarks
+landmarks = []
+
+# Number of landmarks picked by main when --landmarks is given
+landmark_count = 8
+
+# Nodes expanded by the last search, for benchmarking
+search_stats = {"expanded": 0}
+
 
 def load_data(directory):
     """
@@ -51,37 +94,184 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    build_components()
+    build_name_index()
+
+
+def build_components():
+    """
+    Labels the connected component of every person with union-find,
+    people who starred in the same movie share a component.
+    """
+    parents = {person_id: person_id for person_id in people}
+    sizes = dict.fromkeys(people, 1)
+
+    def find(person_id):
+        # Path halving keeps the trees flat
+        while parents[person_id] != person_id:
+            parents[person_id] = parents[parents[person_id]]
+            person_id = parents[person_id]
+        return person_id
+
+    def union(person_id, other_id):
+        # Hang the smaller tree under the larger one
+        root, other = find(person_id), find(other_id)
+        if root == other:
+            return
+        if sizes[root] < sizes[other]:
+            root, other = other, root
+        parents[other] = root
+        sizes[root] += sizes[other]
+
+    # Every star of a movie is connected to its first star
+    for movie in movies.values():
+        stars = list(movie["stars"])
+        for person_id in stars[1:]:
+            union(stars[0], person_id)
+
+    components.clear()
+    oversized_components.clear()
+    for person_id in people:
+        components[person_id] = find(person_id)
+
+
+def connected(source, target):
+    """
+    Returns True if the two people are in the same connected component.
+    """
+    return components.get(source, source) == components.get(target, target)
+
+
+def build_name_index():
+    """
+    Builds the sorted name list and trigram index used by search_names.
+    """
+    sorted_names[:] = sorted(names)
+    postings = {}
+    counts = array("i")
+    for i, name in enumerate(sorted_names):
+        grams = name_trigrams(name)
+        counts.append(len(grams))
+        for gram in grams:
+            postings.setdefault(gram, []).append(i)
+    trigram_counts[:] = counts
+    trigrams.clear()
+    for gram, indexes in postings.items():
+        trigrams[gram] = array("i", indexes)
+
+
+def name_trigrams(name):
+    """
+    Returns the set of trigrams of a lowercase name, padded
+    so that the start and end of the name count for more.
+    """
+    name = f"  {name} "
+    return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+def search_names(query, limit=10, threshold=0.3):
+    """
+    Returns up to limit lowercase names matching the query, best first:
+    the exact name, then names starting with the query, then names
+    whose trigram similarity to the query is at least threshold.
+    """
+    query = query.lower()
+    matches = {}
+
+    # Names starting with the query sit next to each other in sorted order
+    i = bisect_left(sorted_names, query)
+    while i < len(sorted_names) and len(matches) < limit and sorted_names[i].startswith(query):
+        matches[sorted_names[i]] = (sorted_names[i] == query, 1, 1.0)
+        i += 1
+
+    # Count the query trigrams every name shares by merging their postings,
+    # a name with a similarity of at least threshold shares at least needed
+    grams = name_trigrams(query)
+    needed = max(1, math.ceil(threshold * len(grams)))
+    shared_counts = Counter()
+    for gram in grams:
+        shared_counts.update(trigrams.get(gram, ()))
+
+    for i, shared in shared_counts.items():
+        if shared < needed:
+            continue
+        name = sorted_names[i]
+        similarity = shared / (len(grams) + trigram_counts[i] - shared)
+        if similarity >= threshold and name not in matches:
+            matches[name] = (False, 0, similarity)
+
+    # Equally good names come in alphabetical order
+    ranked = sorted(sorted(matches), key=matches.get, reverse=True)
+    return ranked[:limit]
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    options = {"--bidirectional", "--compact", "--landmarks", "--all"}
+    if len(args) > 1 or not flags <= options or {"--compact", "--all"} <= flags:
+        sys.exit("Usage: python degrees.py [directory] "
+                 "[--bidirectional | --compact | --landmarks] [--all]")
+    directory = args[0] if len(args) == 1 else "large"
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    if "--compact" in flags:
+        graph = load_graph(directory)
+        find_person = graph.person_id_for_name
+        search = graph.shortest_path
+        name_of = graph.name_of
+        title_of = graph.title_of
+    else:
+        load_data(directory)
+        find_person = person_id_for_name
+        if "--landmarks" in flags:
+            build_landmarks(landmark_count)
+            search = landmark_shortest_path
+        elif "--bidirectional" in flags:
+            search = bidirectional_shortest_path
+        else:
+            search = shortest_path
+        name_of = lambda person_id: people[person_id]["name"]
+        title_of = lambda movie_id: movies[movie_id]["title"]
     print("Data loaded.")
 
-    source = person_id_for_name(input("Name: "))
+    source = find_person(input("Name: "))
     if source is None:
         sys.exit("Person not found.")
-    target = person_id_for_name(input("Name: "))
+    target = find_person(input("Name: "))
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    if "--all" in flags:
+        paths = all_shortest_paths(source, target)
+    else:
+        paths = [search(source, target)]
+
+    # Paths are printed as they are found, there may be very many of them
+    found = False
+    for path in paths:
+        if path is None:
+            break
+        found = True
+        print_path(source, path, name_of, title_of)
 
-    if path is None:
+    if not found:
         print("Not connected.")
-    else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def print_path(source, path, name_of, title_of):
+    """
+    Prints the degrees of separation along a path from the source.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = name_of(path[i][1])
+        person2 = name_of(path[i + 1][1])
+        movie = title_of(path[i + 1][0])
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
 def shortest_path(source, target):
@@ -91,6 +281,29 @@ def shortest_path(source, target):
 
     If no possible path, returns None.
     """
+    search_stats["expanded"] = 0
+    if not connected(source, target):
+        return None
+    if source == target:
+        return []
+
+    # Popular sources get a tree of their own
+    source_queries[source] += 1
+    if (source_queries[source] >= tree_query_threshold and source not in trees
+            and components[source] not in oversized_components):
+        distances_from(source)
+
+    # Answer from a cached tree of either end, the graph is undirected
+    if source in trees:
+        trees.move_to_end(source)
+        if target not in trees[source]:
+            return None
+        return reverse_path(target, walk_tree(trees[source], target))
+    if target in trees:
+        trees.move_to_end(target)
+        if source not in trees[target]:
+            return None
+        return walk_tree(trees[target], source)
 
     # Initialize starting parameters
     start = Node(state=source, parent=None, action=None)
@@ -105,10 +318,11 @@ def shortest_path(source, target):
 
         # Check if the frontier is empty
         if frontier.empty():
-            raise Exception("No Solution")
+            return None
 
         # Choose a node from the frontier
         node = frontier.remove()
+        search_stats["expanded"] += 1
 
         # Check for a solution
         solution = solutions(node, target)
@@ -131,6 +345,364 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
+def bidirectional_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, growing breadth-first
+    frontiers from both ends until they meet.
+
+    If no possible path, returns None.
+    """
+    search_stats["expanded"] = 0
+    if not connected(source, target):
+        return None
+    if source == target:
+        return []
+
+    # Each side maps a reached person to the (movie_id, person_id) pair
+    # that leads one step back towards the side's starting person
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = [source]
+    backward_frontier = [target]
+
+    # Keep looping while both sides still have people to expand
+    while forward_frontier and backward_frontier:
+
+        # Always grow the smaller frontier, it touches fewer people
+        if len(forward_frontier) <= len(backward_frontier):
+            forward_frontier, meeting = expand_layer(
+                forward_frontier, forward, backward)
+        else:
+            backward_frontier, meeting = expand_layer(
+                backward_frontier, backward, forward)
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(frontier, parents, other_parents):
+    """
+    Expands every person of one breadth-first layer.
+    Returns the next layer and the person where both searches met, if any.
+    """
+    layer = []
+    for person_id in frontier:
+        search_stats["expanded"] += 1
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+
+            # Every person seen by the other side lies on its outermost layer,
+            # so the first meeting already gives the shortest path
+            if neighbor_id in other_parents:
+                return layer, neighbor_id
+            layer.append(neighbor_id)
+    return layer, None
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the two half paths through the meeting person
+    into a list of (movie_id, person_id) pairs.
+    """
+    path = []
+
+    # Walk from the meeting person back to the source
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+
+    # Walk from the meeting person on to the target
+    path.extend(walk_tree(backward, meeting))
+
+    return path
+
+
+def distances_from(source):
+    """
+    Runs one breadth-first search from the source and caches its tree,
+    mapping every reachable person_id to the (movie_id, person_id) pair
+    one step closer to the source. Returns the tree.
+    """
+    if source in trees:
+        trees.move_to_end(source)
+        return trees[source]
+
+    tree = {source: None}
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id not in tree:
+                tree[neighbor_id] = (movie_id, person_id)
+                queue.append(neighbor_id)
+
+    # A tree too large to ever fit is not cached, nor built again for its component
+    if tree_memory(tree) > tree_cache_limit:
+        oversized_components.add(components[source])
+        return tree
+
+    # Evict the least recently used trees until the new one fits
+    trees[source] = tree
+    while len(trees) > 1 and sum(map(tree_memory, trees.values())) > tree_cache_limit:
+        trees.popitem(last=False)
+
+    return tree
+
+
+def tree_memory(tree):
+    """
+    Estimates the bytes held by a tree: the dict and one pair per person.
+    """
+    return sys.getsizeof(tree) + len(tree) * sys.getsizeof((None, None))
+
+
+def walk_tree(tree, person_id):
+    """
+    Follows a tree from a person back to its root and returns
+    the path as a list of (movie_id, person_id) pairs.
+    """
+    path = []
+    while tree[person_id] is not None:
+        movie_id, person_id = tree[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def reverse_path(start, path):
+    """
+    Turns a list of (movie_id, person_id) pairs leading away from start
+    into the path leading from its last person back to start.
+    """
+    person_ids = [start] + [person_id for _, person_id in path[:-1]]
+    return [(movie_id, person_id) for (movie_id, _), person_id in zip(path, person_ids)][::-1]
+
+
+def shortest_path_dag(source, target):
+    """
+    Runs a breadth-first search from the source that stops after the
+    target's layer. Returns a dict mapping every person reached to all
+    (movie_id, person_id) pairs one layer closer to the source, or
+    None if the target was not reached.
+    """
+    if not connected(source, target):
+        return None
+
+    predecessors = {source: []}
+    layer = [source]
+    while layer and target not in predecessors:
+        next_layer = {}
+        for person_id in layer:
+            for movie_id, neighbor_id in neighbors_for_person(person_id):
+                if neighbor_id in next_layer:
+                    next_layer[neighbor_id].append((movie_id, person_id))
+                elif neighbor_id not in predecessors:
+                    next_layer[neighbor_id] = [(movie_id, person_id)]
+        predecessors.update(next_layer)
+        layer = next_layer
+
+    return predecessors if target in predecessors else None
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, one at a time, without ever
+    holding more than one path per layer in memory.
+    """
+    predecessors = shortest_path_dag(source, target)
+    if predecessors is None:
+        return
+
+    # Walk back from the target; each entry holds the rest of the path
+    # as linked ((movie_id, person_id), rest) pairs
+    stack = [(target, None)]
+    while stack:
+        person_id, rest = stack.pop()
+        if person_id == source:
+            yield unlink_path(rest)
+            continue
+        for movie_id, parent_id in reversed(predecessors[person_id]):
+            stack.append((parent_id, ((movie_id, person_id), rest)))
+
+
+def best_shortest_paths(source, target, score="year"):
+    """
+    Yields the shortest lists of (movie_id, person_id) pairs that connect
+    the source to the target, highest total movie score first, where
+    score names one of path_scores. Take the top k with itertools.islice.
+    """
+    predecessors = shortest_path_dag(source, target)
+    if predecessors is None:
+        return
+    movie_score = path_scores[score]
+
+    # Best score of any path from the source to every person, layer by layer
+    best = {source: 0}
+    for person_id, edges in predecessors.items():
+        if edges:
+            best[person_id] = max(best[parent_id] + movie_score(movie_id)
+                                  for movie_id, parent_id in edges)
+
+    # Best-first walk back from the target: the score of a partial path
+    # plus the best way to complete it is exact, so paths pop in order
+    frontier = [(-best[target], 0, 0, target, None)]
+    count = 1
+    while frontier:
+        _, partial, _, person_id, rest = heapq.heappop(frontier)
+        if person_id == source:
+            yield unlink_path(rest)
+            continue
+        for movie_id, parent_id in predecessors[person_id]:
+            value = partial + movie_score(movie_id)
+            heapq.heappush(frontier, (-(value + best[parent_id]), value, count,
+                                      parent_id, ((movie_id, person_id), rest)))
+            count += 1
+
+
+def unlink_path(rest):
+    """Turns linked ((movie_id, person_id), rest) pairs into a list."""
+    path = []
+    while rest is not None:
+        step, rest = rest
+        path.append(step)
+    return path
+
+
+def movie_year(movie_id):
+    """Scores a movie by its release year."""
+    year = movies[movie_id]["year"]
+    return int(year) if year.isdigit() else 0
+
+
+def movie_popularity(movie_id):
+    """Scores a movie by the size of its cast."""
+    return len(movies[movie_id]["stars"])
+
+
+# Ways for best_shortest_paths to score the movies of a path
+path_scores = {
+    "year": movie_year,
+    "popularity": movie_popularity,
+}
+
+
+def build_landmarks(k):
+    """
+    Picks k landmark people and stores the breadth-first distances
+    from each of them. The first landmark is the most credited person,
+    every next one is the person farthest from the landmarks so far.
+    """
+    landmarks.clear()
+    if not people:
+        return
+
+    # Closest landmark distance of every person reached so far
+    closest = {}
+    landmark = max(people, key=lambda person_id: len(people[person_id]["movies"]))
+    for _ in range(k):
+        distances = bfs_distances(landmark)
+        landmarks.append(distances)
+        for person_id, distance in distances.items():
+            if distance < closest.get(person_id, distance + 1):
+                closest[person_id] = distance
+
+        # The next landmark lies as far from the others as possible
+        landmark = max(closest, key=lambda person_id: (
+            closest[person_id], len(people[person_id]["movies"])))
+        if closest[landmark] == 0:
+            break
+
+
+def bfs_distances(source):
+    """
+    Returns the number of degrees from the source
+    to every person_id reachable from it.
+    """
+    distances = {source: 0}
+    queue = deque([source])
+    while queue:
+        person_id = queue.popleft()
+        for _, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id not in distances:
+                distances[neighbor_id] = distances[person_id] + 1
+                queue.append(neighbor_id)
+    return distances
+
+
+def landmark_bound(person_id, target):
+    """
+    Returns a lower bound on the degrees between two people from the
+    triangle inequality over every landmark, or None when a landmark
+    proves that they are not connected.
+    """
+    bound = 0
+    for distances in landmarks:
+        person_distance = distances.get(person_id)
+        target_distance = distances.get(target)
+
+        # A landmark reaching only one of the two separates them
+        if (person_distance is None) != (target_distance is None):
+            return None
+        if person_distance is not None:
+            bound = max(bound, abs(person_distance - target_distance))
+    return bound
+
+
+def landmark_shortest_path(source, target):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, using A* search guided by
+    the landmark lower bounds (ALT). The bounds are consistent,
+    so the first time the target is expanded its path is the shortest.
+
+    If no possible path, returns None.
+    """
+    search_stats["expanded"] = 0
+    if not connected(source, target):
+        return None
+    bound = landmark_bound(source, target)
+    if bound is None:
+        return None
+
+    # Frontier ordered by estimated total degrees, then by fewer degrees so far
+    parents = {source: None}
+    degrees = {source: 0}
+    frontier = [(bound, 0, source)]
+    explored = set()
+
+    while frontier:
+        _, g, person_id = heapq.heappop(frontier)
+        if person_id in explored:
+            continue
+        explored.add(person_id)
+        search_stats["expanded"] += 1
+
+        # Check for a solution
+        if person_id == target:
+            return reverse_path(target, walk_tree(parents, target))
+
+        # Add neighbors to the frontier when this is a shorter way there
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in explored or g + 1 >= degrees.get(neighbor_id, g + 2):
+                continue
+            bound = landmark_bound(neighbor_id, target)
+            if bound is None:
+                continue
+            degrees[neighbor_id] = g + 1
+            parents[neighbor_id] = (movie_id, person_id)
+            heapq.heappush(frontier, (g + 1 + bound, g + 1, neighbor_id))
+
+    return None
+
+
 def solutions(node, target):
     """
     Checks for the solution
@@ -157,14 +729,26 @@ def solutions(node, target):
         return solution
 
 
-def person_id_for_name(name):
+def person_id_for_name(name, policy=None):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    Without a policy, ambiguities are resolved by asking the user.
+    With a policy from disambiguation_policies, the closest name is used
+    when there is no exact match, and ambiguities are resolved by the
+    policy, so the lookup never blocks on input.
     """
     person_ids = list(names.get(name.lower(), set()))
+    if len(person_ids) == 0 and policy is not None:
+        candidates = search_names(name, limit=1)
+        if candidates:
+            person_ids = list(names[candidates[0]])
+
     if len(person_ids) == 0:
         return None
+    elif len(person_ids) > 1 and policy is not None:
+        return min(person_ids, key=disambiguation_policies[policy])
     elif len(person_ids) > 1:
         print(f"Which '{name}'?")
         for person_id in person_ids:
@@ -183,6 +767,24 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def most_credited(person_id):
+    """Sorts people with the most movies first."""
+    return -len(people[person_id]["movies"]), person_id
+
+
+def earliest_birth(person_id):
+    """Sorts people born earliest first, unknown births last."""
+    birth = people[person_id]["birth"]
+    return not birth.isdigit(), int(birth) if birth.isdigit() else 0, person_id
+
+
+# Non-interactive ways for person_id_for_name to pick among people of the same name
+disambiguation_policies = {
+    "credits": most_credited,
+    "birth": earliest_birth,
+}
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
@@ -0,0 +1,352 @@
+import csv
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+
+# Snapshot layout: magic, CSV key, counts, then 8-byte aligned sections
+SNAPSHOT_FILE = "graph.snapshot"
+SNAPSHOT_MAGIC = b"DEGREES1"
+SNAPSHOT_HEADER = struct.Struct("<8s6q3q")
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+
+class Graph():
+    """
+    Compact star graph: IMDb ids are interned to dense integers and the
+    bipartite person/movie graph is stored as CSR arrays, i.e. the movies
+    of person p are person_movies[person_offsets[p]:person_offsets[p + 1]].
+    """
+
+    def __init__(self):
+        # Dense index -> IMDb id and details
+        self.person_ids = []
+        self.person_names = []
+        self.person_births = []
+        self.movie_ids = []
+        self.movie_titles = []
+        self.movie_years = []
+
+        # IMDb id -> dense index
+        self.person_index = {}
+        self.movie_index = {}
+
+        # Lowercase names in sorted order and the person index of each
+        self.sorted_names = []
+        self.name_order = array("i")
+
+        # Memory map backing the arrays when loaded from a snapshot
+        self.snapshot = None
+
+        # CSR adjacency in both directions
+        self.person_offsets = array("i", [0])
+        self.person_movies = array("i")
+        self.movie_offsets = array("i", [0])
+        self.movie_stars = array("i")
+
+    def person_id_for_name(self, name):
+        """
+        Returns the IMDB id for a person's name,
+        resolving ambiguities as needed.
+        """
+        person_ids = [self.person_ids[person] for person in self.people_named(name)]
+        if len(person_ids) == 0:
+            return None
+        elif len(person_ids) > 1:
+            print(f"Which '{name}'?")
+            for person_id in person_ids:
+                person = self.person_index[person_id]
+                name = self.person_names[person]
+                birth = self.person_births[person]
+                print(f"ID: {person_id}, Name: {name}, Birth: {birth}")
+            try:
+                person_id = input("Intended Person ID: ")
+                if person_id in person_ids:
+                    return person_id
+            except ValueError:
+                pass
+            return None
+        else:
+            return person_ids[0]
+
+    def people_named(self, name):
+        """Returns the person indexes with a name, ignoring case."""
+        name = name.lower()
+        start = bisect_left(self.sorted_names, name)
+        end = bisect_right(self.sorted_names, name, start)
+        return self.name_order[start:end]
+
+    def name_of(self, person_id):
+        """Returns the name of a person IMDb id."""
+        return self.person_names[self.person_index[person_id]]
+
+    def title_of(self, movie_id):
+        """Returns the title of a movie IMDb id."""
+        return self.movie_titles[self.movie_index[movie_id]]
+
+    def movies_of(self, person):
+        """Returns the movie indexes a person index starred in."""
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """Returns the person indexes that starred in a movie index."""
+        return self.movie_stars[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        neighbors = set()
+        for movie in self.movies_of(self.person_index[person_id]):
+            for star in self.stars_of(movie):
+                neighbors.add((self.movie_ids[movie], self.person_ids[star]))
+        return neighbors
+
+    def shortest_path(self, source, target):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target.
+
+        If no possible path, returns None.
+        """
+        source = self.person_index[source]
+        target = self.person_index[target]
+        if source == target:
+            return []
+
+        # Visited bitmaps, a movie only needs to be scanned once
+        visited = bytearray(len(self.person_ids))
+        seen_movies = bytearray(len(self.movie_ids))
+
+        # Parent pointers and a preallocated queue, all on integer ids
+        parent_person = array("i", [-1]) * len(self.person_ids)
+        parent_movie = array("i", [-1]) * len(self.person_ids)
+        queue = array("i", [0]) * len(self.person_ids)
+        queue[0] = source
+        visited[source] = 1
+        head, tail = 0, 1
+
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_stars = self.movie_offsets, self.movie_stars
+
+        # Keep looping until the queue runs dry
+        while head < tail:
+            person = queue[head]
+            head += 1
+
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+
+                for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    star = movie_stars[j]
+                    if visited[star]:
+                        continue
+                    visited[star] = 1
+                    parent_person[star] = person
+                    parent_movie[star] = movie
+
+                    # Check the new person before queueing it
+                    if star == target:
+                        return self.path_to(target, parent_person, parent_movie)
+
+                    queue[tail] = star
+                    tail += 1
+
+        return None
+
+    def path_to(self, person, parent_person, parent_movie):
+        """
+        Follows the parent pointers back from a person and returns
+        the path as a list of (movie_id, person_id) pairs.
+        """
+        path = []
+        while parent_person[person] != -1:
+            path.append((self.movie_ids[parent_movie[person]], self.person_ids[person]))
+            person = parent_person[person]
+        path.reverse()
+        return path
+
+
+def load_graph(directory, cache=True):
+    """
+    Load data into a compact Graph, from the binary snapshot
+    next to the CSV files when it is still up to date.
+    """
+    snapshot = f"{directory}/{SNAPSHOT_FILE}"
+    if cache:
+        key = csv_key(directory)
+        graph = load_snapshot(snapshot, key)
+        if graph is not None:
+            return graph
+
+    graph = load_csv(directory)
+
+    if cache:
+        try:
+            save_snapshot(graph, snapshot, key)
+        except OSError:
+            pass
+    return graph
+
+
+def load_csv(directory):
+    """
+    Load data from CSV files into a compact Graph.
+    """
+    graph = Graph()
+
+    # Load people
+    with open(f"{directory}/people.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            graph.person_index[row["id"]] = len(graph.person_ids)
+            graph.person_ids.append(row["id"])
+            graph.person_names.append(row["name"])
+            graph.person_births.append(row["birth"])
+
+    # Load movies
+    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            graph.movie_index[row["id"]] = len(graph.movie_ids)
+            graph.movie_ids.append(row["id"])
+            graph.movie_titles.append(row["title"])
+            graph.movie_years.append(row["year"])
+
+    # Load stars as parallel edge arrays, skipping unknown ids
+    edge_people = array("i")
+    edge_movies = array("i")
+    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            person = graph.person_index.get(row["person_id"])
+            movie = graph.movie_index.get(row["movie_id"])
+            if person is not None and movie is not None:
+                edge_people.append(person)
+                edge_movies.append(movie)
+
+    # Sort the name index once so lookups can bisect it
+    lower_names = [name.lower() for name in graph.person_names]
+    graph.name_order = array("i", sorted(range(len(lower_names)), key=lower_names.__getitem__))
+    graph.sorted_names = [lower_names[person] for person in graph.name_order]
+
+    graph.person_offsets, graph.person_movies = build_csr(
+        len(graph.person_ids), edge_people, edge_movies)
+    graph.movie_offsets, graph.movie_stars = build_csr(
+        len(graph.movie_ids), edge_movies, edge_people)
+
+    return graph
+
+
+def build_csr(size, sources, targets):
+    """
+    Builds CSR offsets and indices for edges sources[i] -> targets[i].
+    """
+    # Count the edges of every source
+    offsets = array("i", [0]) * (size + 1)
+    for source in sources:
+        offsets[source + 1] += 1
+
+    # Turn the counts into running offsets
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    # Place every edge in its source's slot
+    indices = array("i", [0]) * len(sources)
+    cursor = offsets[:-1]
+    for source, target in zip(sources, targets):
+        indices[cursor[source]] = target
+        cursor[source] += 1
+
+    return offsets, indices
+
+
+def csv_key(directory):
+    """
+    Returns the size and modification time of every CSV file,
+    which identifies the data a snapshot was built from.
+    """
+    key = []
+    for filename in CSV_FILES:
+        stat = os.stat(f"{directory}/{filename}")
+        key.extend((stat.st_size, stat.st_mtime_ns))
+    return tuple(key)
+
+
+def save_snapshot(graph, path, key):
+    """
+    Writes the graph as a binary snapshot that load_snapshot can map.
+    """
+    sections = [
+        graph.person_offsets, graph.person_movies,
+        graph.movie_offsets, graph.movie_stars, graph.name_order,
+    ]
+    sections = [bytes(array("i", section)) for section in sections]
+    for strings in (graph.person_ids, graph.person_names, graph.person_births,
+                    graph.movie_ids, graph.movie_titles, graph.movie_years,
+                    graph.sorted_names):
+        sections.append("\0".join(strings).encode("utf-8"))
+
+    # Write to a temporary file first so readers never see half a snapshot
+    counts = (len(graph.person_ids), len(graph.movie_ids), len(graph.movie_stars))
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, *key, *counts))
+        f.write(struct.pack(f"<{len(sections)}q", *(len(section) for section in sections)))
+        for section in sections:
+            f.write(section)
+            f.write(bytes(-len(section) % 8))
+    os.replace(f"{path}.tmp", path)
+
+
+def load_snapshot(path, key):
+    """
+    Maps a snapshot written by save_snapshot into a Graph.
+    Returns None if there is no snapshot or it is out of date.
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    if len(data) < SNAPSHOT_HEADER.size:
+        return None
+    magic, *header = SNAPSHOT_HEADER.unpack_from(data)
+    if magic != SNAPSHOT_MAGIC or tuple(header[:6]) != key:
+        return None
+
+    # Slice every section out of the mapping without copying
+    lengths = struct.unpack_from("<12q", data, SNAPSHOT_HEADER.size)
+    view = memoryview(data)
+    offset = SNAPSHOT_HEADER.size + struct.calcsize("<12q")
+    sections = []
+    for length in lengths:
+        sections.append(view[offset:offset + length])
+        offset += length + (-length % 8)
+
+    graph = Graph()
+    graph.snapshot = data
+    (graph.person_offsets, graph.person_movies, graph.movie_offsets,
+     graph.movie_stars, graph.name_order) = (section.cast("i") for section in sections[:5])
+    people, movies = header[6:8]
+    counts = (people, people, people, movies, movies, movies, people)
+    (graph.person_ids, graph.person_names, graph.person_births,
+     graph.movie_ids, graph.movie_titles, graph.movie_years,
+     graph.sorted_names) = (split_strings(section, count)
+                            for section, count in zip(sections[5:], counts))
+
+    graph.person_index = dict(zip(graph.person_ids, range(len(graph.person_ids))))
+    graph.movie_index = dict(zip(graph.movie_ids, range(len(graph.movie_ids))))
+    return graph
+
+
+def split_strings(section, count):
+    """Decodes a section of count NUL separated strings."""
+    if count == 0:
+        return []
+    return str(section, "utf-8").split("\0")
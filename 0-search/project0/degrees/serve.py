@@ -0,0 +1,172 @@
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import degrees
+
+USAGE = "Usage: python serve.py [directory] [--workers=N] [--http=PORT] [--policy=credits|birth]"
+
+# How names shared by several people are resolved, see degrees.disambiguation_policies
+policy = "credits"
+
+
+def init_worker(directory, name_policy):
+    """
+    Loads the data in a worker, unless it was inherited from the parent.
+    """
+    global policy
+    policy = name_policy
+    if not degrees.people:
+        degrees.load_data(directory)
+
+
+def resolve(name):
+    """
+    Returns the IMDB id for a person id or name without ever prompting.
+    Raises ValueError if no person matches.
+    """
+    if name in degrees.people:
+        return name
+    person_id = degrees.person_id_for_name(name, policy)
+    if person_id is None:
+        raise ValueError(f"person not found: '{name}'")
+    return person_id
+
+
+def answer(query):
+    """
+    Answers one {"source": ..., "target": ...} query with
+    its path, degrees of separation and latency.
+    """
+    start = time.perf_counter()
+    response = {"source": query.get("source"), "target": query.get("target")}
+    try:
+        source = resolve(str(query["source"]))
+        target = resolve(str(query["target"]))
+        path = degrees.shortest_path(source, target)
+        response["degrees"] = None if path is None else len(path)
+        response["path"] = path
+    except (KeyError, ValueError) as e:
+        response["error"] = str(e)
+    response["latency_ms"] = (time.perf_counter() - start) * 1000
+    return response
+
+
+def parse(line):
+    """Parses one JSON line into a query, reporting bad input as an error."""
+    try:
+        query = json.loads(line)
+    except ValueError:
+        return {"source": None, "target": None, "error": "invalid JSON"}
+    if not isinstance(query, dict):
+        return {"source": None, "target": None, "error": "query must be an object"}
+    return query
+
+
+def answer_line(line):
+    """Answers one JSON line, passing parse errors straight through."""
+    query = parse(line)
+    if "error" in query:
+        query["latency_ms"] = 0.0
+        return query
+    return answer(query)
+
+
+def serve_stdin(pool):
+    """
+    Answers JSON line queries from stdin in order, one JSON line each,
+    then reports latency statistics on stderr.
+    """
+    latencies = []
+    lines = (line for line in sys.stdin if line.strip())
+    for response in pool.imap(answer_line, lines, chunksize=16):
+        latencies.append(response["latency_ms"])
+        print(json.dumps(response), flush=True)
+    report(latencies)
+
+
+def report(latencies):
+    """Prints query latency statistics to stderr."""
+    if not latencies:
+        return
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"{len(latencies)} queries, "
+          f"mean {statistics.mean(latencies):.2f}ms, "
+          f"median {statistics.median(latencies):.2f}ms, "
+          f"p95 {p95:.2f}ms", file=sys.stderr)
+
+
+def serve_http(pool, port):
+    """
+    Answers queries over HTTP on localhost, either
+    GET /?source=...&target=... or a POSTed JSON query.
+    """
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            params = parse_qs(urlparse(self.path).query)
+            query = {key: values[0] for key, values in params.items()}
+            self.respond(pool.apply(answer, (query,)))
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            self.respond(pool.apply(answer_line, (self.rfile.read(length),)))
+
+        def respond(self, response):
+            body = json.dumps(response).encode("utf-8")
+            self.send_response(400 if "error" in response else 200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    print(f"Serving on http://127.0.0.1:{port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    options = {}
+    args = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value
+        else:
+            args.append(arg)
+    if len(args) > 1 or not set(options) <= {"workers", "http", "policy"}:
+        sys.exit(USAGE)
+    name_policy = options.get("policy") or policy
+    if name_policy not in degrees.disambiguation_policies:
+        sys.exit(USAGE)
+    directory = args[0] if args else "large"
+    try:
+        workers = int(options.get("workers") or multiprocessing.cpu_count())
+        port = int(options["http"]) if "http" in options else None
+    except ValueError:
+        sys.exit(USAGE)
+
+    # Load once, forked workers share the warm graph
+    print("Loading data...", file=sys.stderr)
+    degrees.load_data(directory)
+    print("Data loaded.", file=sys.stderr)
+
+    with multiprocessing.Pool(workers, init_worker, (directory, name_policy)) as pool:
+        if port is None:
+            serve_stdin(pool)
+        else:
+            serve_http(pool, port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+Tic Tac Toe arena
+
+Plays many headless engine-vs-engine games in parallel and reports
+win/draw rates, time per move, nodes per second and transposition
+table hit rates per engine, as JSON or CSV.
+
+Usage: python arena.py ENGINE ENGINE [--games=N] [--size=N] [--win=K]
+       [--time=SECONDS] [--openings=MOVES] [--workers=N] [--output=FILE]
+
+An engine is one of ENGINES, optionally with a depth limit, e.g. pvs:3.
+"""
+
+import csv
+import json
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import bitboard
+import tictactoe as ttt
+
+USAGE = ("Usage: python arena.py ENGINE ENGINE [--games=N] [--size=N] [--win=K] "
+         "[--time=SECONDS] [--openings=MOVES] [--workers=N] [--output=FILE]")
+
+
+def random_engine(board, depth, time_limit):
+    """Plays a random move."""
+    return random.choice(sorted(ttt.actions(board)))
+
+
+def minimax_engine(board, depth, time_limit):
+    """Plays the move of the alpha-beta search, without the opening book."""
+    return ttt.minimax(board, depth=depth, time_limit=time_limit, use_book=False)
+
+
+def pvs_engine(board, depth, time_limit):
+    """Plays the move of the principal variation search."""
+    return ttt.minimax(board, depth=depth, time_limit=time_limit, use_book=False, pvs=True)
+
+
+def book_engine(board, depth, time_limit):
+    """Plays from the opening book, searching where it has no answer."""
+    return ttt.minimax(board, depth=depth, time_limit=time_limit)
+
+
+def bitboard_engine(board, depth, time_limit):
+    """Plays the move of the bitboard engine, 3 x 3 boards only."""
+    return bitboard.minimax(board)
+
+
+ENGINES = {
+    "random": random_engine,
+    "minimax": minimax_engine,
+    "pvs": pvs_engine,
+    "book": book_engine,
+    "bitboard": bitboard_engine,
+}
+
+
+def parse_engine(spec):
+    """
+    Returns the (name, depth) of an engine spec such as pvs:3.
+    Raises ValueError for an unknown engine or a bad depth.
+    """
+    name, _, depth = spec.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"unknown engine '{name}', choose from {', '.join(ENGINES)}")
+    return name, int(depth) if depth else None
+
+
+def play_game(game):
+    """
+    Plays one game described by a dict of settings. Returns the winner
+    and the moves, time, nodes and table hits of each side.
+    """
+    ttt.win_length = game["win"]
+    rng = random.Random(game["seed"])
+    random.seed(game["seed"])
+
+    # Every game starts from a fresh table and a few random moves
+    ttt.transposition_table.clear()
+    board = ttt.initial_state(game["size"])
+    for _ in range(game["openings"]):
+        if ttt.terminal(board):
+            break
+        board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+
+    sides = {
+        "X": {"engine": game["x"], "moves": 0, "time": 0.0, "nodes": 0, "table_hits": 0},
+        "O": {"engine": game["o"], "moves": 0, "time": 0.0, "nodes": 0, "table_hits": 0},
+    }
+    while not ttt.terminal(board):
+        side = sides[ttt.player(board)]
+        name, depth = parse_engine(side["engine"])
+        for stat in ttt.search_stats:
+            ttt.search_stats[stat] = 0
+
+        start = time.perf_counter()
+        action = ENGINES[name](board, depth, game["time"])
+        side["time"] += time.perf_counter() - start
+        side["moves"] += 1
+        side["nodes"] += ttt.search_stats["nodes"]
+        side["table_hits"] += ttt.search_stats["table_hits"]
+
+        board = ttt.result(board, action)
+
+    return {"winner": ttt.winner(board), "sides": sides}
+
+
+def tally(results, engines):
+    """
+    Sums the game results into one row of statistics per engine.
+    """
+    rows = {engine: {"engine": engine, "games": 0, "wins": 0, "losses": 0, "draws": 0,
+                     "moves": 0, "time": 0.0, "nodes": 0, "table_hits": 0}
+            for engine in engines}
+    for game in results:
+        for mark, side in game["sides"].items():
+            row = rows[side["engine"]]
+            row["games"] += 1
+            if game["winner"] is None:
+                row["draws"] += 1
+            elif game["winner"] == mark:
+                row["wins"] += 1
+            else:
+                row["losses"] += 1
+            for stat in ("moves", "time", "nodes", "table_hits"):
+                row[stat] += side[stat]
+
+    for row in rows.values():
+        games = max(row["games"], 1)
+        row["win_rate"] = row["wins"] / games
+        row["draw_rate"] = row["draws"] / games
+        row["ms_per_move"] = row["time"] / max(row["moves"], 1) * 1000
+        row["nodes_per_second"] = row["nodes"] / row["time"] if row["time"] else 0.0
+        row["table_hit_rate"] = row["table_hits"] / row["nodes"] if row["nodes"] else 0.0
+    return list(rows.values())
+
+
+def write_report(rows, settings, output):
+    """
+    Writes the report as CSV if output ends in .csv, as JSON otherwise,
+    to stdout when there is no output file.
+    """
+    if output is not None and output.endswith(".csv"):
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+
+    report = json.dumps({"settings": settings, "engines": rows}, indent=2)
+    if output is None:
+        print(report)
+    else:
+        with open(output, "w") as f:
+            f.write(report + "\n")
+
+
+def main():
+    options = {}
+    args = []
+    for arg in sys.argv[1:]:
+        if arg.startswith("--"):
+            key, _, value = arg[2:].partition("=")
+            options[key] = value
+        else:
+            args.append(arg)
+    allowed = {"games", "size", "win", "time", "openings", "workers", "output"}
+    if len(args) != 2 or not set(options) <= allowed:
+        sys.exit(USAGE)
+
+    try:
+        for engine in args:
+            parse_engine(engine)
+        settings = {
+            "engines": args,
+            "games": int(options.get("games") or 100),
+            "size": int(options.get("size") or 3),
+            "win": int(options["win"]) if options.get("win") else None,
+            "time": float(options["time"]) if options.get("time") else None,
+            "openings": int(options.get("openings") or 1),
+        }
+        workers = int(options["workers"]) if options.get("workers") else None
+    except ValueError as e:
+        sys.exit(f"{e}\n{USAGE}")
+    if settings["size"] != 3 and "bitboard" in {parse_engine(engine)[0] for engine in args}:
+        sys.exit("The bitboard engine only plays on 3 x 3 boards")
+
+    # Engines swap sides every game, each game has its own opening
+    games = [dict(settings, seed=i, x=args[i % 2], o=args[1 - i % 2])
+             for i in range(settings["games"])]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(play_game, games, chunksize=8))
+
+    write_report(tally(results, args), settings, options.get("output"))
+
+
+if __name__ == "__main__":
+    main()
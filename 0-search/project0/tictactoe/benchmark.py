@@ -0,0 +1,106 @@
+import random
+import sys
+import time
+
+import parallel
+import tictactoe as ttt
+
+
+def positions(count, size=4, moves=3, seed=50):
+    """
+    Returns a seeded suite of unfinished boards, each a few random moves in.
+    """
+    rng = random.Random(seed)
+    suite = []
+    while len(suite) < count:
+        board = ttt.initial_state(size)
+        for _ in range(moves):
+            board = ttt.result(board, rng.choice(sorted(ttt.actions(board))))
+        if not ttt.terminal(board):
+            suite.append(board)
+    return suite
+
+
+def time_search(search, suite, pool):
+    """
+    Runs a search over every board of the suite, each with empty
+    transposition tables. Returns the total time and the root values.
+    """
+    total = 0.0
+    values = []
+    for board in suite:
+        ttt.transposition_table.clear()
+        parallel.reset_tables(pool)
+        start = time.perf_counter()
+        values.append(search(board)[0])
+        total += time.perf_counter() - start
+    return total, values
+
+
+def measure_pruning(suite, depth):
+    """
+    Prints the nodes, cutoffs and time of the sequential search over the
+    suite with and without move ordering and principal variation search.
+    """
+    variants = {
+        "plain order": (False, False),
+        "ordered": (True, False),
+        "ordered + pvs": (True, True),
+    }
+    for name, (ordering, pvs) in variants.items():
+        ttt.search_settings["ordering"] = ordering
+        ttt.search_settings["pvs"] = pvs
+        for stat in ttt.search_stats:
+            ttt.search_stats[stat] = 0
+
+        start = time.perf_counter()
+        for board in suite:
+            ttt.transposition_table.clear()
+            ttt.killer_moves.clear()
+            ttt.history.clear()
+            ttt.search_root(board, depth)
+        elapsed = time.perf_counter() - start
+
+        print(f"{name}: {ttt.search_stats['nodes']} nodes, "
+              f"{ttt.search_stats['cutoffs']} cutoffs, {elapsed:.3f}s")
+
+    ttt.search_settings["ordering"] = True
+    ttt.search_settings["pvs"] = False
+
+
+def main():
+    if len(sys.argv) > 4:
+        sys.exit("Usage: python benchmark.py [positions] [depth] [workers]")
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    ttt.win_length = None
+    ttt.search_settings["evaluate"] = ttt.evaluate
+    suite = positions(count)
+    pool = parallel.make_pool(workers)
+
+    searches = {
+        "sequential": lambda board: ttt.search_root(board, depth),
+        "parallel": lambda board: parallel.parallel_search_root(
+            board, depth, pool, young_brothers_wait=False),
+        "parallel ybw": lambda board: parallel.parallel_search_root(board, depth, pool),
+    }
+    try:
+        results = {name: time_search(search, suite, pool) for name, search in searches.items()}
+    finally:
+        pool.shutdown()
+
+    # Every search must agree on the value of every position
+    sequential, values = results["sequential"]
+    print(f"{count} positions on 4 x 4, depth {depth}, {pool._max_workers} workers")
+    for name, (total, search_values) in results.items():
+        if search_values != values:
+            sys.exit(f"{name} disagrees with sequential: {search_values} != {values}")
+        print(f"{name}: {total:.3f}s, speedup {sequential / total:.2f}x")
+
+    measure_pruning(suite, depth)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Tic Tac Toe Player backed by bitboards
+
+Each player's marks are kept as the bits of one integer, cell (i, j)
+being bit 3 * i + j. The functions at the bottom of the module adapt
+the bitboards to the list board API of tictactoe.py, so runner.py can
+use either engine.
+"""
+
+import math
+
+X = "X"
+O = "O"
+EMPTY = None
+
+FULL = 0b111111111
+
+# Rows, columns and both diagonals
+WIN_MASKS = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+# WINS[bits] is 1 if the marks in bits complete a line
+WINS = bytes(
+    any(bits & mask == mask for mask in WIN_MASKS)
+    for bits in range(FULL + 1)
+)
+
+# Center first, then corners, then edges: the usual strongest moves
+MOVE_ORDER = tuple(1 << cell for cell in (4, 0, 2, 6, 8, 1, 3, 5, 7))
+
+
+def to_bitboards(board):
+    """
+    Returns the (X, O) bitboards of a list board.
+    """
+    x_bits = o_bits = 0
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell == X:
+                x_bits |= 1 << (3 * i + j)
+            elif cell == O:
+                o_bits |= 1 << (3 * i + j)
+    return x_bits, o_bits
+
+
+def to_board(x_bits, o_bits):
+    """
+    Returns the list board of (X, O) bitboards.
+    """
+    return [[X if x_bits >> (3 * i + j) & 1 else O if o_bits >> (3 * i + j) & 1 else EMPTY
+             for j in range(3)]
+            for i in range(3)]
+
+
+def negamax(own, other, alpha, beta):
+    """
+    Returns the value of a position for the player to move, who owns
+    the bits in own: 1 for a win, -1 for a loss and 0 for a draw.
+    The previous move was the opponent's, so only they can have won.
+    """
+    if WINS[other]:
+        return -1
+    empty = FULL & ~(own | other)
+    if not empty:
+        return 0
+
+    value = -math.inf
+    for bit in MOVE_ORDER:
+        if empty & bit:
+
+            # Making a move is a single or, unmaking it is just not using it
+            value = max(value, -negamax(other, own | bit, -beta, -alpha))
+            alpha = max(alpha, value)
+            if alpha >= beta:
+                break
+    return value
+
+
+def best_move(own, other):
+    """
+    Returns the bit of the best move for the player owning own,
+    or None if the game is over.
+    """
+    empty = FULL & ~(own | other)
+    if WINS[own] or WINS[other] or not empty:
+        return None
+
+    best, value = None, -math.inf
+    alpha, beta = -math.inf, math.inf
+    for bit in MOVE_ORDER:
+        if empty & bit:
+            score = -negamax(other, own | bit, -beta, -alpha)
+            if score > value:
+                best, value = bit, score
+                alpha = max(alpha, score)
+    return best
+
+
+def initial_state():
+    """
+    Returns starting state of the board.
+    """
+    return to_board(0, 0)
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    x_bits, o_bits = to_bitboards(board)
+    return O if bin(x_bits).count("1") > bin(o_bits).count("1") else X
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    x_bits, o_bits = to_bitboards(board)
+    empty = FULL & ~(x_bits | o_bits)
+    return {divmod(cell, 3) for cell in range(9) if empty >> cell & 1}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    x_bits, o_bits = to_bitboards(board)
+    bit = 1 << (3 * i + j)
+    if (x_bits | o_bits) & bit:
+        raise NameError('Not a Valid Action!')
+    if player(board) == X:
+        return to_board(x_bits | bit, o_bits)
+    return to_board(x_bits, o_bits | bit)
+
+
+def winner(board):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    x_bits, o_bits = to_bitboards(board)
+    if WINS[x_bits]:
+        return X
+    elif WINS[o_bits]:
+        return O
+    else:
+        return None
+
+
+def terminal(board):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    x_bits, o_bits = to_bitboards(board)
+    return bool(WINS[x_bits] or WINS[o_bits] or x_bits | o_bits == FULL)
+
+
+def utility(board):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    x_bits, o_bits = to_bitboards(board)
+    return 1 if WINS[x_bits] else -1 if WINS[o_bits] else 0
+
+
+def minimax(board, cancel=None):
+    """
+    Returns the optimal action for the current player on the board.
+    The cancel event of tictactoe.minimax is accepted and ignored,
+    a bitboard search is over before it could be cancelled.
+    """
+    x_bits, o_bits = to_bitboards(board)
+    if player(board) == X:
+        bit = best_move(x_bits, o_bits)
+    else:
+        bit = best_move(o_bits, x_bits)
+    if bit is None:
+        return None
+    return divmod(bit.bit_length() - 1, 3)
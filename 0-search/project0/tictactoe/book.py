@@ -0,0 +1,117 @@
+"""
+Tic Tac Toe opening book
+
+Stores the optimal action of every reachable 3 x 3 position in a packed
+array, so the AI can answer by lookup instead of searching. A position
+is indexed by reading its cells as a base 3 number (empty 0, X 1, O 2)
+and its action is a 4-bit cell number, two positions per byte.
+
+Usage: python book.py build [book.bin]
+"""
+
+import mmap
+import os
+import sys
+
+import tictactoe as ttt
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+
+# Number of 3 x 3 positions, reachable or not
+POSITIONS = 3 ** 9
+
+# Stored for positions without an action: unreachable or game over
+NO_ACTION = 0xF
+
+DIGITS = {None: 0, "X": 1, "O": 2}
+
+# Memory maps of the loaded book files, by path
+_books = {}
+
+
+def position_index(board):
+    """
+    Returns the index of a 3 x 3 board, or None if the board has no place in a book.
+    """
+    if len(board) != 3 or any(len(row) != 3 for row in board):
+        return None
+    index = 0
+    for row in board:
+        for cell in row:
+            if cell not in DIGITS:
+                return None
+            index = index * 3 + DIGITS[cell]
+    return index
+
+
+def build(path=BOOK_FILE):
+    """
+    Solves every position reachable from the initial state
+    and writes its optimal action to a book file.
+    """
+    actions = bytearray([NO_ACTION]) * POSITIONS
+
+    # Depth-first walk over the reachable positions
+    stack = [ttt.initial_state()]
+    seen = set()
+    while stack:
+        board = stack.pop()
+        index = position_index(board)
+        if index in seen or ttt.terminal(board):
+            continue
+        seen.add(index)
+
+        i, j = ttt.minimax(board, use_book=False)
+        actions[index] = 3 * i + j
+        for action in ttt.actions(board):
+            stack.append(ttt.result(board, action))
+
+    # Pack two positions into every byte, the even one in the low nibble
+    packed = bytearray((POSITIONS + 1) // 2)
+    for index, action in enumerate(actions):
+        packed[index // 2] |= action << (4 * (index % 2))
+
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(packed)
+    os.replace(f"{path}.tmp", path)
+    return len(seen)
+
+
+def load(path=BOOK_FILE):
+    """
+    Memory-maps a book file, once. Returns None if there is no book.
+    """
+    if path not in _books:
+        try:
+            with open(path, "rb") as f:
+                _books[path] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            _books[path] = None
+    return _books[path]
+
+
+def lookup(board, path=BOOK_FILE):
+    """
+    Returns the optimal action (i, j) of a 3 x 3 board from the book,
+    or None if there is no book or no action for the board.
+    """
+    book = load(path)
+    index = position_index(board)
+    if book is None or index is None or index // 2 >= len(book):
+        return None
+    action = book[index // 2] >> (4 * (index % 2)) & 0xF
+    if action == NO_ACTION:
+        return None
+    return divmod(action, 3)
+
+
+def main():
+    if len(sys.argv) not in (2, 3) or sys.argv[1] != "build":
+        sys.exit("Usage: python book.py build [book.bin]")
+    path = sys.argv[2] if len(sys.argv) == 3 else BOOK_FILE
+    positions = build(path)
+    print(f"Wrote {positions} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,86 @@
 import math
 
-def win_combinations(n):
+# Cached win combinations of every board size and win length
+_win_combinations = {}
+
+# Cached cell orders of the symmetries of every board size, see symmetries
+_symmetries = {}
+
+def win_combinations(n, k=None):
     """
-    Return a List of possible win combination indexes
+    Return a List of possible win combination indexes,
+    every line of k cells in a row on an n x n board (k defaults to n)
     """
+    k = n if k is None else k
+    if (n, k) in _win_combinations:
+        return _win_combinations[(n, k)]
+
     combinations = []
+    starts = range(n - k + 1)
 
     # Rows
     for row in range(n):
-        combinations.append([(row, cell) for cell in range(n)])
+        for start in starts:
+            combinations.append([(row, start + cell) for cell in range(k)])
 
     # Columns
     for cell in range(n):
-        combinations.append([(row, cell) for row in range(3)])
+        for start in starts:
+            combinations.append([(start + row, cell) for row in range(k)])
+
+    for row in starts:
+        for cell in starts:
 
-    # Diagonal top left to bottom left
-    combinations.append([(cell, cell) for cell in range(n)])
-    
-    # Diagonal top right to bottom left
-    combinations.append([(cell, n - 1 - cell) for cell in range(n)])
+            # Diagonal top left to bottom right
+            combinations.append([(row + i, cell + i) for i in range(k)])
 
+            # Diagonal top right to bottom left
+            combinations.append([(row + i, cell + k - 1 - i) for i in range(k)])
+
+    _win_combinations[(n, k)] = combinations
     return combinations
 
 
-def is_winner(board, decorator):
+def is_winner(board, decorator, k=None):
     """
     Returns True if the Winner has decorated a possible Win condition
     """
     n = len(board)
-    combinations = win_combinations(n)
+    combinations = win_combinations(n, k)
 
     for combination in combinations:
         if all(board[row][cell] == decorator for row, cell in combination):
             return True
-    return False
\ No newline at end of file
+    return False
+
+
+def symmetries(n):
+    """
+    Return the 8 rotations and reflections of an n x n board,
+    each as a List of (row, cell) indexes in reading order
+    """
+    if n not in _symmetries:
+        transforms = [
+            lambda row, cell: (row, cell),
+            lambda row, cell: (cell, n - 1 - row),
+            lambda row, cell: (n - 1 - row, n - 1 - cell),
+            lambda row, cell: (n - 1 - cell, row),
+            lambda row, cell: (row, n - 1 - cell),
+            lambda row, cell: (n - 1 - row, cell),
+            lambda row, cell: (cell, row),
+            lambda row, cell: (n - 1 - cell, n - 1 - row),
+        ]
+        _symmetries[n] = [[transform(row, cell) for row in range(n) for cell in range(n)]
+                          for transform in transforms]
+    return _symmetries[n]
+
+
+def canonical_key(board):
+    """
+    Returns the same String for a board and all of its rotations and
+    reflections: the smallest of their cells read row by row
+    """
+    return min(
+        "".join(board[row][cell] or "." for row, cell in symmetry)
+        for symmetry in symmetries(len(board))
+    )
@@ -0,0 +1,129 @@
+"""
+Parallel root-split minimax
+
+The actions of the root are searched by a pool of processes. The best
+value found so far is shared between the workers, so every child
+search starts with the tightest alpha-beta window available.
+With young brothers wait, the first (best ordered) action is searched
+before the others are handed out, which gives the workers a bound to
+prune with from the start.
+"""
+
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import tictactoe as ttt
+
+# Best root value found so far in X's terms, shared by the pool's workers
+_best = None
+
+# Generation of the transposition table of this worker, see reset_tables
+_generation = 0
+
+
+def init_worker(best, win_length, evaluate):
+    """
+    Sets up a worker process with the shared bound and the game settings.
+    The evaluation function is part of every transposition table key,
+    so the worker never reuses values scored by another one.
+    """
+    global _best
+    _best = best
+    ttt.win_length = win_length
+    ttt.search_settings["evaluate"] = evaluate
+
+
+def make_pool(workers=None, evaluate=ttt.evaluate):
+    """
+    Returns a process pool for parallel_minimax, which can be reused for
+    many searches as long as ttt.win_length does not change.
+    """
+    best = multiprocessing.Value("d", 0.0)
+    pool = ProcessPoolExecutor(
+        max_workers=workers, initializer=init_worker,
+        initargs=(best, ttt.win_length, evaluate))
+    pool.best = best
+    pool.generation = 0
+    return pool
+
+
+def reset_tables(pool):
+    """
+    Makes every worker of the pool start its next search with an
+    empty transposition table.
+    """
+    pool.generation += 1
+
+
+def search_action(board, action, depth, generation):
+    """
+    Returns the value of an action at the root, searched depth - 1 more
+    moves deep within the window of the best value found so far.
+    """
+    global _generation
+    if generation != _generation:
+        ttt.transposition_table.clear()
+        _generation = generation
+
+    child = ttt.result(board, action)
+    if ttt.player(board) == "X":
+        alpha = _best.value
+        value = ttt.min_value(child, alpha, math.inf, depth - 1)
+        with _best.get_lock():
+            _best.value = max(_best.value, value)
+    else:
+        beta = _best.value
+        value = ttt.max_value(child, -math.inf, beta, depth - 1)
+        with _best.get_lock():
+            _best.value = min(_best.value, value)
+    return value
+
+
+def parallel_search_root(board, depth, pool, young_brothers_wait=True):
+    """
+    Searches every action of the board depth moves ahead across the pool.
+    Returns the best value and action for the current player.
+    """
+    maximizing = ttt.player(board) == "X"
+    better = (lambda a, b: a > b) if maximizing else (lambda a, b: a < b)
+    pool.best.value = -math.inf if maximizing else math.inf
+
+    actions = ttt.ordered_actions(board)
+    value, optimal_action = pool.best.value, None
+
+    # Search the eldest brother alone so every other search has a bound
+    if young_brothers_wait:
+        optimal_action = actions[0]
+        value = pool.submit(search_action, board, optimal_action, depth, pool.generation).result()
+        actions = actions[1:]
+
+    futures = {pool.submit(search_action, board, action, depth, pool.generation): action for action in actions}
+    for future in as_completed(futures):
+
+        # A value cut off by the shared bound is no better than the best one
+        value_action = future.result()
+        if optimal_action is None or better(value_action, value):
+            value, optimal_action = value_action, futures[future]
+
+    return value, optimal_action
+
+
+def parallel_minimax(board, depth=None, pool=None, young_brothers_wait=True):
+    """
+    Returns the optimal action for the current player on the board,
+    searched depth moves ahead (the whole game by default) in parallel.
+    """
+    if ttt.terminal(board):
+        return None
+    remaining = len(ttt.actions(board))
+    depth = remaining if depth is None else min(depth, remaining)
+
+    own_pool = pool is None
+    if own_pool:
+        pool = make_pool()
+    try:
+        return parallel_search_root(board, depth, pool, young_brothers_wait)[1]
+    finally:
+        if own_pool:
+            pool.shutdown()
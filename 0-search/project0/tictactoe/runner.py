@@ -1,8 +1,32 @@
+import os
 import pygame
 import sys
 import time
 
-import tictactoe as ttt
+from worker import AIWorker
+
+# Command line options: --bitboard, --size=N, --win=K, --time=SECONDS and --headless[=GAMES]
+options = dict(arg[2:].partition("=")[::2] for arg in sys.argv[1:] if arg.startswith("--"))
+board_size = int(options.get("size") or 3)
+
+# Headless mode lets the AI play itself without a display, for CI benchmarks
+headless = "headless" in options
+headless_games = int(options.get("headless") or 10)
+if headless:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Boards larger than 3 x 3 cannot be searched fully, give the AI a time budget per move
+time_limit = float(options["time"]) if options.get("time") else None
+if time_limit is None and board_size > 3:
+    time_limit = 1.0
+
+# The bitboard engine implements the same functions as tictactoe.py, on 3 x 3 boards only
+if "bitboard" in options and board_size == 3:
+    import bitboard as ttt
+    time_limit = None
+else:
+    import tictactoe as ttt
+    ttt.win_length = int(options["win"]) if options.get("win") else None
 
 pygame.init()
 size = width, height = 600, 400
@@ -17,16 +41,33 @@ mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
 largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
 moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
 
-user = None
-board = ttt.initial_state()
-ai_turn = False
+user = ttt.X if headless else None
+board = ttt.initial_state() if board_size == 3 else ttt.initial_state(board_size)
+
+# The AI searches in the background, its move is shown no sooner than ai_delay seconds
+ai = AIWorker(ttt, time_limit)
+ai_delay = 0 if headless else 0.5
+ai_started = None
+
+# Frame and game statistics for headless mode
+clock = pygame.time.Clock()
+longest_frame = 0
+frames = 0
+results = []
 
 while True:
+    frame_start = time.perf_counter()
+    reset = False
 
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
+            ai.shutdown()
             sys.exit()
 
+        # R starts over at any time, even while the AI is thinking
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_r:
+            reset = True
+
     screen.fill(black)
 
     # Let user choose a player.
@@ -67,13 +108,13 @@ while True:
     else:
 
         # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
+        tile_size = min(80, 280 // board_size)
+        tile_origin = (width / 2 - (board_size / 2 * tile_size),
+                       height / 2 - (board_size / 2 * tile_size))
         tiles = []
-        for i in range(3):
+        for i in range(board_size):
             row = []
-            for j in range(3):
+            for j in range(board_size):
                 rect = pygame.Rect(
                     tile_origin[0] + j * tile_size,
                     tile_origin[1] + i * tile_size,
@@ -83,6 +124,10 @@ while True:
 
                 if board[i][j] != ttt.EMPTY:
                     move = moveFont.render(board[i][j], True, white)
+                    if board_size > 3:
+                        move = pygame.transform.smoothscale(
+                            move, (move.get_width() * tile_size // 80,
+                                   move.get_height() * tile_size // 80))
                     moveRect = move.get_rect()
                     moveRect.center = rect.center
                     screen.blit(move, moveRect)
@@ -99,7 +144,7 @@ while True:
                 title = f"Game Over: Tie."
             else:
                 title = f"Game Over: {winner} wins."
-        elif user == player:
+        elif user == player and not headless:
             title = f"Play as {user}"
         else:
             title = f"Computer thinking..."
@@ -108,26 +153,30 @@ while True:
         titleRect.center = ((width / 2), 30)
         screen.blit(title, titleRect)
 
-        # Check for AI move
-        if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
+        # Check for AI move, searched in the background so the window keeps rendering
+        if (headless or user != player) and not game_over:
+            if not ai.busy():
+                ai.start(board)
+                ai_started = time.perf_counter()
+            elif time.perf_counter() - ai_started >= ai_delay:
+                move = ai.poll()
+                if move is not None:
+                    board = ttt.result(board, move)
 
         # Check for a user move
         click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
+        if click == 1 and user == player and not game_over and not headless:
             mouse = pygame.mouse.get_pos()
-            for i in range(3):
-                for j in range(3):
+            for i in range(board_size):
+                for j in range(board_size):
                     if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
                         board = ttt.result(board, (i, j))
 
-        if game_over:
+        if game_over and headless:
+            results.append(ttt.winner(board))
+            reset = len(results) < headless_games
+
+        if game_over and not headless:
             againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
             again = mediumFont.render("Play Again", True, black)
             againRect = again.get_rect()
@@ -139,8 +188,27 @@ while True:
                 mouse = pygame.mouse.get_pos()
                 if againButton.collidepoint(mouse):
                     time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
+                    reset = True
+
+        # Start over without waiting for a search of the old board
+        if reset:
+            ai.cancel()
+            user = ttt.X if headless else None
+            board = ttt.initial_state() if board_size == 3 else ttt.initial_state(board_size)
 
     pygame.display.flip()
+
+    # Frame time excludes the wait for the next tick of the 60 FPS clock
+    frames += 1
+    longest_frame = max(longest_frame, time.perf_counter() - frame_start)
+    clock.tick(60)
+
+    if headless and len(results) >= headless_games:
+        ai.shutdown()
+        moves = ai.move_times
+        print(f"Games: {len(results)}, X wins: {results.count(ttt.X)}, "
+              f"O wins: {results.count(ttt.O)}, ties: {results.count(None)}")
+        print(f"Frames: {frames}, longest frame: {longest_frame * 1000:.1f}ms")
+        print(f"AI moves: {len(moves)}, "
+              f"mean {sum(moves) / max(len(moves), 1) * 1000:.1f}ms per move")
+        sys.exit()
@@ -3,21 +3,62 @@ Tic Tac Toe Player
 """
 
 import math
+import time
 from copy import deepcopy
-from helpers import is_winner
+from helpers import is_winner, canonical_key, win_combinations
+import book
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Bound types of a stored value: the exact value, or a bound on it
+EXACT = "exact"
+LOWER = "lower"
+UPPER = "upper"
 
-def initial_state():
+# Number of marks in a row that wins, None means a whole row of the board
+win_length = None
+
+# Maps (win length, evaluation function, canonical board key) to the (value, bound type,
+# depth) found by a search, values of depth-limited searches depend on the evaluation
+transposition_table = {}
+
+# Evaluation values stay inside (-EVALUATION_SCALE, EVALUATION_SCALE), below a win
+EVALUATION_SCALE = 0.5
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget runs out."""
+
+
+class SearchCancelled(Exception):
+    """Raised inside a search when its cancel event is set."""
+
+
+# The heuristic, time budget and options of the search in progress, see minimax:
+# pvs turns on principal variation search, ordering the killer and history heuristics,
+# and cancel holds the threading.Event that stops the search when set
+search_settings = {"evaluate": None, "deadline": None, "pvs": False, "ordering": True, "cancel": None}
+
+# Width of the null window principal variation search probes with
+NULL_WINDOW = 1e-9
+
+# Up to two actions per number of empty cells that recently caused a cutoff
+killer_moves = {}
+
+# Maps actions to how much pruning they have caused, weighted by depth
+history = {}
+
+# Counts of nodes visited, alpha-beta cutoffs and transposition table hits
+search_stats = {"nodes": 0, "cutoffs": 0, "table_hits": 0}
+
+
+def initial_state(size=3):
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return [[EMPTY] * size for _ in range(size)]
 
 
 def player(board):
@@ -82,9 +123,9 @@ def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    if is_winner(board, "X"):
+    if is_winner(board, "X", win_length):
         return "X"
-    elif is_winner(board, "O"):
+    elif is_winner(board, "O", win_length):
         return "O"
     else:
         return None
@@ -112,13 +153,154 @@ def utility(board):
         return 0
 
 
-def minimax(board):
+def evaluate(board):
+    """
+    Estimates the value of an unfinished board for X, between
+    -EVALUATION_SCALE and EVALUATION_SCALE. Every line that only one
+    player has marked counts for that player, more so the fuller it is.
+    """
+    scores = {"X": 0, "O": 0}
+    for combination in win_combinations(len(board), win_length):
+        marks = [board[row][cell] for row, cell in combination]
+        x_count = marks.count("X")
+        o_count = marks.count("O")
+        if x_count and not o_count:
+            scores["X"] += 4 ** x_count
+        elif o_count and not x_count:
+            scores["O"] += 4 ** o_count
+    total = scores["X"] + scores["O"]
+    if total == 0:
+        return 0
+    return EVALUATION_SCALE * (scores["X"] - scores["O"]) / total
+
+
+def ordered_actions(board, first=None):
+    """
+    Returns the possible actions, best candidates first: the given first
+    action, then the killer moves of this depth, then by history score,
+    and then the center and the corners before the other cells.
+    On boards larger than 5 x 5 only cells next to a mark are considered,
+    as moves far from play rarely matter.
+    """
+    n = len(board)
+    center = (n - 1) / 2
+    candidates = actions(board)
+
+    # Killers are kept by the number of empty cells, see record_cutoff
+    killers = killer_moves.get(len(candidates), ())
+
+    if n > 5 and len(candidates) < n * n:
+        candidates = {
+            (i, j) for i, j in candidates
+            if any(board[r][c] != EMPTY
+                   for r in range(max(0, i - 1), min(n, i + 2))
+                   for c in range(max(0, j - 1), min(n, j + 2)))
+        }
+
+    if not search_settings["ordering"]:
+        return sorted(candidates)
+
+    corners = {0, n - 1}
+
+    ordered = sorted(candidates, key=lambda action: (
+        action != first,
+        action not in killers,
+        -history.get(action, 0),
+        max(abs(action[0] - center), abs(action[1] - center)),
+        not (action[0] in corners and action[1] in corners),
+        action))
+    return ordered
+
+
+def record_cutoff(board, action, depth):
+    """
+    Remembers an action that caused a cutoff as a killer move of this
+    many empty cells and raises its history score.
+    """
+    search_stats["cutoffs"] += 1
+    killers = killer_moves.setdefault(len(actions(board)), [])
+    if action not in killers:
+        killers.insert(0, action)
+        del killers[2:]
+    history[action] = history.get(action, 0) + depth * depth
+
+
+def minimax(board, depth=None, time_limit=None, evaluate=evaluate, use_book=True, pvs=False,
+            cancel=None):
     """
     Returns the optimal action for the current player on the board.
+
+    Without a depth or time limit the whole game tree is searched.
+    Otherwise the search deepens one move at a time, up to depth moves
+    ahead and for at most time_limit seconds, scoring the boards where it
+    stops with evaluate, and returns the best action of the deepest
+    search that finished.
+
+    Full searches of 3 x 3 boards are answered from the opening book
+    when it exists, see book.py. With pvs, the actions after the first
+    of every node are probed with a null window (principal variation search).
+    Setting the cancel event from another thread stops the search,
+    which then returns None.
     """
     if terminal(board):
         return None
 
+    if use_book and depth is None and time_limit is None and win_length in (None, 3):
+        action = book.lookup(board)
+        if action is not None:
+            return action
+
+    # Killer moves and history only describe the current position
+    killer_moves.clear()
+    history.clear()
+    search_settings["pvs"] = pvs
+    search_settings["cancel"] = cancel
+    search_settings["evaluate"] = evaluate
+    search_settings["deadline"] = None if time_limit is None else time.perf_counter() + time_limit
+
+    # A full search needs no more moves than there are empty cells
+    remaining = len(actions(board))
+    try:
+        if depth is None and time_limit is None:
+            return search_root(board, remaining)[1]
+        return deepen(board, remaining if depth is None else min(depth, remaining))
+    except SearchCancelled:
+        return None
+    finally:
+        search_settings["evaluate"] = None
+        search_settings["deadline"] = None
+        search_settings["cancel"] = None
+
+
+def deepen(board, max_depth):
+    """
+    Searches the board one move deeper at a time up to max_depth moves,
+    until the time budget runs out. Returns the best action of the
+    deepest search that finished.
+    """
+    # Iterative deepening: every finished depth seeds the next one's move order
+    optimal_action = None
+    try:
+        for current_depth in range(1, max_depth + 1):
+            value, optimal_action = search_root(board, current_depth, optimal_action)
+
+            # Nothing deeper changes a forced win or loss
+            if abs(value) == 1:
+                break
+    except SearchTimeout:
+        pass
+
+    # Out of time before even one move deep, any move beats none
+    if optimal_action is None:
+        optimal_action = ordered_actions(board)[0]
+    return optimal_action
+
+
+def search_root(board, depth, first=None):
+    """
+    Searches every action of the board depth moves ahead.
+    Returns the best value and action for the current player.
+    """
     optimal_action = None
 
     # Variables for alpha-beta pruning
@@ -132,16 +314,18 @@ def minimax(board):
         value = -math.inf
 
         # We check all current possible actions
-        for action in actions(board):
+        for action in ordered_actions(board, first):
 
             # We calculate the value of the action by invoking a recursive formula
             # which explores all possible future actions
-            value_action = min_value(result(board, action), alpha, beta)
+            value_action = min_value(result(board, action), alpha, beta, depth - 1)
 
-            # Then we acquire the most optimal solution
+            # Then we acquire the most optimal solution, and later actions
+            # only need to show whether they beat it
             if value_action > value:
                 value = value_action
                 optimal_action = action
+                alpha = max(alpha, value)
 
     else:
 
@@ -149,61 +333,172 @@ def minimax(board):
         value = math.inf
 
         # We check all current possible actions
-        for action in actions(board):
+        for action in ordered_actions(board, first):
 
             # We calculate the value of the action by invoking a recursive formula
             # which explores all possible future actions
-            value_action = max_value(result(board, action), alpha, beta)
+            value_action = max_value(result(board, action), alpha, beta, depth - 1)
 
-            # Then we acquire the most optimal solution
+            # Then we acquire the most optimal solution, and later actions
+            # only need to show whether they beat it
             if value_action < value:
                 value = value_action
                 optimal_action = action
+                beta = min(beta, value)
 
-    return optimal_action
-
+    return value, optimal_action
 
-def min_value(board, alpha, beta):
 
-    # Check if the game is over
+def horizon(board, depth):
+    """
+    Checks the clock and the cancel event, then returns the value of the
+    board if the search stops here: the game is over or no depth is left.
+    Otherwise None.
+    """
+    search_stats["nodes"] += 1
+    if search_settings["cancel"] is not None and search_settings["cancel"].is_set():
+        raise SearchCancelled()
+    if search_settings["deadline"] is not None and time.perf_counter() > search_settings["deadline"]:
+        raise SearchTimeout()
     if terminal(board):
         return utility(board)
+    if depth <= 0:
+        return search_settings["evaluate"](board)
+    return None
+
+
+def min_value(board, alpha, beta, depth=math.inf):
+
+    # Check if the game is over or the search is deep enough
+    value = horizon(board, depth)
+    if value is not None:
+        return value
+
+    # Reuse what an earlier search found for this position or a symmetric one
+    depth = min(depth, len(actions(board)))
+    key = (win_length, search_settings["evaluate"], canonical_key(board))
+    value = lookup(key, alpha, beta, depth)
+    if value is not None:
+        return value
+    alpha, beta = window(key, alpha, beta, depth)
+    searched_alpha, searched_beta = alpha, beta
 
     # For Min Value we want starting value to be positive infinity
     value = math.inf
 
     # We calculate the value of the action by invoking a recursive formula
     # which explores all possible future actions
-    for action in actions(board):
-        value = min(value, max_value(result(board, action), alpha, beta))
+    for index, action in enumerate(ordered_actions(board)):
+        child = result(board, action)
+
+        # Principal variation search: after the first action, only prove
+        # that an action is no better, and search it fully if it is
+        if search_settings["pvs"] and index > 0 and beta - alpha > NULL_WINDOW:
+            score = max_value(child, beta - NULL_WINDOW, beta, depth - 1)
+            if alpha < score < beta:
+                score = max_value(child, alpha, score, depth - 1)
+        else:
+            score = max_value(child, alpha, beta, depth - 1)
+        value = min(value, score)
 
         # If alpha is higher then beta then there is no point in continuing
         # Because no other value can beat this score
         beta = min(value, beta)
         if alpha > beta:
+            record_cutoff(board, action, depth)
             break
 
+    store(key, value, searched_alpha, searched_beta, depth)
     return value
 
 
-def max_value(board, alpha, beta):
+def max_value(board, alpha, beta, depth=math.inf):
 
-    # Check if the game is over
-    if terminal(board):
-        return utility(board)
+    # Check if the game is over or the search is deep enough
+    value = horizon(board, depth)
+    if value is not None:
+        return value
+
+    # Reuse what an earlier search found for this position or a symmetric one
+    depth = min(depth, len(actions(board)))
+    key = (win_length, search_settings["evaluate"], canonical_key(board))
+    value = lookup(key, alpha, beta, depth)
+    if value is not None:
+        return value
+    alpha, beta = window(key, alpha, beta, depth)
+    searched_alpha, searched_beta = alpha, beta
 
     # For Max Value we want starting value to be negative infinity
     value = -math.inf
 
     # We calculate the value of the action by invoking a recursive formula
     # which explores all possible future actions
-    for action in actions(board):
-        value = max(value, min_value(result(board, action), alpha, beta))
+    for index, action in enumerate(ordered_actions(board)):
+        child = result(board, action)
+
+        # Principal variation search: after the first action, only prove
+        # that an action is no better, and search it fully if it is
+        if search_settings["pvs"] and index > 0 and beta - alpha > NULL_WINDOW:
+            score = min_value(child, alpha, alpha + NULL_WINDOW, depth - 1)
+            if alpha < score < beta:
+                score = min_value(child, score, beta, depth - 1)
+        else:
+            score = min_value(child, alpha, beta, depth - 1)
+        value = max(value, score)
 
         # If alpha is higher then beta then there is no point in continuing
         # Because no other value can beat this score
         alpha = max(value, alpha)
         if alpha > beta:
+            record_cutoff(board, action, depth)
             break
 
-    return value
\ No newline at end of file
+    store(key, value, searched_alpha, searched_beta, depth)
+    return value
+
+
+def lookup(key, alpha, beta, depth):
+    """
+    Returns the stored value of a position if it was searched at least
+    depth moves deep and settles the search within the alpha-beta
+    window, None otherwise.
+    """
+    entry = transposition_table.get(key)
+    if entry is None or entry[2] < depth:
+        return None
+
+    value, bound, _ = entry
+    if (bound == EXACT
+            or bound == LOWER and value >= beta
+            or bound == UPPER and value <= alpha):
+        search_stats["table_hits"] += 1
+        return value
+    return None
+
+
+def window(key, alpha, beta, depth):
+    """
+    Narrows the alpha-beta window with a stored bound on the position.
+    """
+    entry = transposition_table.get(key)
+    if entry is not None and entry[2] >= depth:
+        value, bound, _ = entry
+        if bound == LOWER:
+            alpha = max(alpha, value)
+        elif bound == UPPER:
+            beta = min(beta, value)
+    return alpha, beta
+
+
+def store(key, value, alpha, beta, depth):
+    """
+    Stores a searched value together with its bound type and depth: a
+    value at or outside the window it was searched with only bounds the
+    real value.
+    """
+    if value <= alpha:
+        transposition_table[key] = (value, UPPER, depth)
+    elif value >= beta:
+        transposition_table[key] = (value, LOWER, depth)
+    else:
+        transposition_table[key] = (value, EXACT, depth)
@@ -0,0 +1,66 @@
+"""
+Background AI worker for the Tic Tac Toe runner
+
+Searches run on a thread of their own so the game loop keeps rendering
+while the AI thinks. The loop starts a search, polls for its move every
+frame and cancels a search whose board is no longer in play.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
+
+
+class AIWorker():
+
+    def __init__(self, engine, time_limit=None):
+        """
+        Engine - module with a minimax(board, ..., cancel=event) function
+        Time limit - seconds per move, None for a full search
+        """
+        self.engine = engine
+        self.time_limit = time_limit
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.future = None
+        self.cancel_event = None
+
+        # Seconds taken by every finished search, for benchmarking
+        self.move_times = []
+
+    def start(self, board):
+        """Starts searching for the best move on the board."""
+        self.cancel()
+        self.cancel_event = threading.Event()
+        self.future = self.executor.submit(self.search, deepcopy(board), self.cancel_event)
+
+    def search(self, board, cancel):
+        start = time.perf_counter()
+        if self.time_limit is None:
+            move = self.engine.minimax(board, cancel=cancel)
+        else:
+            move = self.engine.minimax(board, time_limit=self.time_limit, cancel=cancel)
+        if not cancel.is_set():
+            self.move_times.append(time.perf_counter() - start)
+        return move
+
+    def busy(self):
+        """Returns True while a search is running or its move is unclaimed."""
+        return self.future is not None
+
+    def poll(self):
+        """Returns the move of the finished search once, None until then."""
+        if self.future is None or not self.future.done():
+            return None
+        future, self.future = self.future, None
+        return future.result()
+
+    def cancel(self):
+        """Stops the running search without waiting for it and drops its move."""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.future = None
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False)
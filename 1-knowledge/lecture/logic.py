@@ -1,12 +1,37 @@
 import itertools
 
 
+class EvaluationException(Exception):
+    """Raised when a sentence refers to a symbol the model does not assign."""
+
+
 class Sentence():
 
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
 
+    def expression(self, index):
+        """
+        Returns a Python expression evaluating the logical sentence in a
+        model m, an integer whose bit index[name] is the value of each symbol.
+        """
+        raise Exception("nothing to evaluate")
+
+    def compile(self, index):
+        """
+        Compiles the logical sentence into a function of an integer model,
+        see expression, that returns the same as evaluate does.
+        Sentences nested too deeply for the Python parser fall back to
+        evaluate on a dict built from the integer model.
+        """
+        try:
+            return eval(f"lambda m: bool({self.expression(index)})")
+        except (SyntaxError, RecursionError, MemoryError):
+            def evaluate(m):
+                return self.evaluate({name: bool(m >> i & 1) for name, i in index.items()})
+            return evaluate
+
     def formula(self):
         """Returns string formula representing logical sentence."""
         return ""
@@ -62,6 +87,12 @@ class Symbol(Sentence):
         except KeyError:
             raise EvaluationException(f"variable {self.name} not in model")
 
+    def expression(self, index):
+        try:
+            return f"(m >> {index[self.name]} & 1)"
+        except KeyError:
+            raise EvaluationException(f"variable {self.name} not in model")
+
     def formula(self):
         return self.name
 
@@ -86,6 +117,9 @@ class Not(Sentence):
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
+    def expression(self, index):
+        return f"(not {self.operand.expression(index)})"
+
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
@@ -120,6 +154,13 @@ class And(Sentence):
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
+    def expression(self, index):
+        if not self.conjuncts:
+            return "True"
+        return "(" + " and ".join(
+            conjunct.expression(index) for conjunct in self.conjuncts
+        ) + ")"
+
     def formula(self):
         if len(self.conjuncts) == 1:
             return self.conjuncts[0].formula()
@@ -151,6 +192,13 @@ class Or(Sentence):
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
+    def expression(self, index):
+        if not self.disjuncts:
+            return "False"
+        return "(" + " or ".join(
+            disjunct.expression(index) for disjunct in self.disjuncts
+        ) + ")"
+
     def formula(self):
         if len(self.disjuncts) == 1:
             return self.disjuncts[0].formula()
@@ -183,6 +231,11 @@ class Implication(Sentence):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
 
+    def expression(self, index):
+        antecedent = self.antecedent.expression(index)
+        consequent = self.consequent.expression(index)
+        return f"(not {antecedent} or {consequent})"
+
     def formula(self):
         antecedent = Sentence.parenthesize(self.antecedent.formula())
         consequent = Sentence.parenthesize(self.consequent.formula())
@@ -211,10 +264,12 @@ class Biconditional(Sentence):
         return f"Biconditional({self.left}, {self.right})"
 
     def evaluate(self, model):
-        return ((self.left.evaluate(model)
-                 and self.right.evaluate(model))
-                or (not self.left.evaluate(model)
-                    and not self.right.evaluate(model)))
+        return self.left.evaluate(model) == self.right.evaluate(model)
+
+    def expression(self, index):
+        left = self.left.expression(index)
+        right = self.right.expression(index)
+        return f"((not {left}) == (not {right}))"
 
     def formula(self):
         left = Sentence.parenthesize(str(self.left))
@@ -228,36 +283,14 @@ class Biconditional(Sentence):
 def model_check(knowledge, query):
     """Checks if knowledge base entails query."""
 
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
-
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
-        else:
-
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
-
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
-
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
-
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
+    # Get all symbols in both knowledge and query, each model is an
+    # integer with one bit per symbol
+    symbols = sorted(set.union(knowledge.symbols(), query.symbols()))
+    index = {symbol: i for i, symbol in enumerate(symbols)}
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+    # Compile both sentences once rather than walking them in every model
+    knowledge = knowledge.compile(index)
+    query = query.compile(index)
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Check that query is true in every model where knowledge base is true
+    return all(query(model) for model in range(2 ** len(symbols)) if knowledge(model))